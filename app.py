@@ -1,21 +1,173 @@
+import os
 from flask import Flask
 from flask_login import LoginManager
 from flask_migrate import Migrate
-from models import db, User
-from config import Config
+from models import db, User, backfill_student_ratings, configure_sqlite, reconcile_job_counters
+from cache import page_cache
+import images
+import assets
+import tasks
+import ledger
+import instrumentation
+import principal
+import uploads
+import bench
+import click
 
 app = Flask(__name__)
-app.config.from_object(Config)
+app.config.from_object(os.environ.get("APP_CONFIG", "config.Config"))
 
 # Init extensions
+instrumentation.init_app(app)  # before the engines exist: it times SQLite row fetches
 db.init_app(app)
+configure_sqlite(app)
+page_cache.init_app(app)
+images.init_app(app)
+assets.init_app(app)
+principal.init_app(app)
+uploads.init_app(app)
 login_manager = LoginManager(app)
 login_manager.login_view = "auth.login"
 migrate = Migrate(app, db)
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    return principal.load_principal(int(user_id))
+
+@app.cli.command("backfill-ratings")
+def backfill_ratings_command():
+    """Recompute stored student rating aggregates from reviews."""
+    backfill_student_ratings()
+    print("✅ Student rating aggregates rebuilt.")
+
+@app.cli.command("reconcile-job-counters")
+def reconcile_job_counters_command():
+    """Recompute per-job application counters from the Application table."""
+    drifted = reconcile_job_counters()
+    print(f"✅ Job application counters reconciled ({drifted} jobs corrected).")
+
+@app.cli.command("rebuild-earnings")
+def rebuild_earnings_command():
+    """Recompute the monthly earnings/spend ledger from payments."""
+    rows = ledger.rebuild_ledger()
+    print(f"✅ Earnings ledger rebuilt ({rows} rows).")
+
+@app.cli.command("check-query-plans")
+def check_query_plans_command():
+    """Fail if any route query falls back to a full table scan (SQLite)."""
+    from explain import check_query_plans
+    failures = check_query_plans()
+    for label, scans in failures.items():
+        print(f"❌ {label}: {'; '.join(scans)}")
+    if failures:
+        raise SystemExit(1)
+    print("✅ All route queries use an index.")
+
+@app.cli.command("rebuild-search-index")
+def rebuild_search_index_command():
+    """Recreate and repopulate the full-text search tables."""
+    from search import rebuild_search_index
+    rebuild_search_index()
+    print("✅ Search index rebuilt.")
+
+@app.cli.command("rebuild-match-vectors")
+def rebuild_match_vectors_command():
+    """Recompute job and student skill vectors used for matching."""
+    from matching import rebuild_vectors
+    rebuild_vectors()
+    print("✅ Matching vectors rebuilt.")
+
+@app.cli.command("build-image-variants")
+def build_image_variants_command():
+    """Generate WebP variants for profile pictures that have none yet."""
+    paths = {
+        u.profile_pic for u in User.query.filter(
+            User.profile_pic.like("uploads/%"), User.profile_pic_variants.is_(None)
+        )
+    }
+    for path in paths:
+        images.process_profile_pic(app, path)
+    print(f"✅ Built variants for {len(paths)} profile pictures.")
+
+@app.cli.command("build-assets")
+def build_assets_command():
+    """Write content-hashed, precompressed copies of static assets to static/dist."""
+    manifest = assets.build_assets(app.static_folder)
+    print(f"✅ Built {len(manifest)} static assets.")
+
+@app.cli.command("run-worker")
+@click.option("--once", is_flag=True, help="Exit once the queue has nothing due.")
+def run_worker_command(once):
+    """Run queued side-effect tasks (messages, emails, payments)."""
+    tasks.run_worker(app, once=once)
+
+@app.cli.command("requeue-dead-tasks")
+@click.argument("task_ids", nargs=-1, type=int)
+def requeue_dead_tasks_command(task_ids):
+    """Retry dead-lettered tasks (all of them if no ids are given)."""
+    count = tasks.requeue_dead(task_ids)
+    print(f"✅ Requeued {count} tasks.")
+
+@app.cli.command("sync-replica")
+@click.option("--interval", type=float, help="Keep syncing every N seconds.")
+def sync_replica_command(interval):
+    """Copy the SQLite primary into the SQLite replica (local stand-in for replication)."""
+    import replica
+    if interval:
+        replica.run_replication(app, interval)
+    replica.sync_replica(app)
+    print("✅ Replica synced.")
+
+@app.cli.command("seed-data")
+@click.option("--scale", type=float, default=0.01, show_default=True,
+              help="1.0 = 100k users, 200k jobs, 1M messages.")
+@click.option("--seed", type=int, default=42, show_default=True, help="Random seed.")
+def seed_data_command(scale, seed):
+    """Fill an empty database with synthetic users, jobs, projects and messages."""
+    from seed import seed_database
+    db.create_all()
+    try:
+        seed_database(scale, seed)
+    except RuntimeError as exc:
+        raise click.ClickException(str(exc))
+    print("✅ Database seeded.")
+
+@app.cli.command("bench")
+@click.option("--iterations", type=int, default=20, show_default=True, help="Timed requests per route.")
+@click.option("--route", "routes", multiple=True, help="Only routes whose name starts with this (repeatable).")
+@click.option("--output", type=click.Path(dir_okay=False), help="Write the results as JSON.")
+@click.option("--compare", "baseline_path", type=click.Path(exists=True, dir_okay=False),
+              help="Fail if any route regressed against this baseline.")
+@click.option("--tolerance", type=float, default=bench.LATENCY_TOLERANCE, show_default=True,
+              help="Allowed p50 slowdown (twice that for p95).")
+def bench_command(iterations, routes, output, baseline_path, tolerance):
+    """Time every route through the test client and record p50/p95 and query counts."""
+    import json
+    results = bench.run_benchmarks(app, iterations, routes)
+    if output:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"✅ Results written to {output}.")
+    if baseline_path:
+        with open(baseline_path) as f:
+            problems = bench.compare(results, json.load(f), tolerance)
+        for problem in problems:
+            print(f"❌ {problem}")
+        if problems:
+            raise SystemExit(1)
+        print("✅ No regressions against the baseline.")
+
+@app.cli.command("check-query-counts")
+@click.option("--scale", "scales", type=float, multiple=True,
+              help="Seed sizes to compare (repeatable; default 0.002 and 0.01).")
+def check_query_counts_command(scales):
+    """Fail if any route's SQL statement count changes with the amount of data."""
+    problems = bench.check_query_counts(scales or bench.QUERY_COUNT_SCALES)
+    for problem in problems:
+        print(f"❌ {problem}")
+    if problems:
+        raise SystemExit(1)
+    print("✅ Every route issues the same number of statements at each data size.")
 
 # Register Blueprints
 from routes.auth_routes import auth_bp
@@ -24,6 +176,8 @@ from routes.student_routes import student_bp
 from routes.admin_routes import admin_bp
 from routes.message_routes import message_bp
 from routes.blog_routes import blog_bp ,explore_bp
+from routes.search_routes import search_bp
+from routes.api_routes import api_bp
 
 
 app.register_blueprint(auth_bp)
@@ -33,8 +187,16 @@ app.register_blueprint(admin_bp)
 app.register_blueprint(message_bp)
 app.register_blueprint(blog_bp)
 app.register_blueprint(explore_bp) 
+app.register_blueprint(search_bp)
+app.register_blueprint(api_bp)
 
 if __name__ == "__main__":
     with app.app_context():
         db.create_all()
+    # Run queued tasks in the reloader's child process only
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        tasks.start_worker_thread(app)
+        if "replica" in app.config.get("SQLALCHEMY_BINDS", {}):
+            import replica
+            replica.start_replication_thread(app)
     app.run(debug=True)
@@ -0,0 +1,123 @@
+"""Static asset fingerprinting and caching.
+
+``flask build-assets`` copies every static asset (everything except user
+uploads) to ``static/dist/`` under a content-hashed name, writes gzip and,
+when the ``brotli`` package is installed, brotli siblings, and records the
+mapping in ``static/dist/manifest.json``. ``url_for('static', ...)`` then
+emits the hashed name, and those files are served with a one-year
+immutable Cache-Control. Uploads are already content-addressed (see
+uploads.py), so files named by their SHA-256 are immutable too.
+
+Every static response supports ETag/Last-Modified revalidation and Range
+requests.
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import shutil
+from flask import current_app, request, send_from_directory
+
+try:
+    import brotli
+except ImportError:  # optional: gzip siblings only
+    brotli = None
+
+DIST = "dist"
+MANIFEST = "manifest.json"
+USER_CONTENT = ("uploads/", "proofs/", f"{DIST}/")
+COMPRESSIBLE = {".css", ".js", ".svg", ".json", ".html", ".txt", ".map", ".xml", ".ico"}
+ONE_YEAR = 365 * 24 * 3600
+_CONTENT_ADDRESSED = re.compile(r"(^|/)[0-9a-f]{64}[^/]*$")
+
+_manifest = {}
+
+
+def build_assets(static_folder):
+    """Fingerprint and precompress static assets; returns the manifest."""
+    dist = os.path.join(static_folder, DIST)
+    shutil.rmtree(dist, ignore_errors=True)
+    manifest = {}
+    for root, _, files in os.walk(static_folder):
+        for name in files:
+            source = os.path.join(root, name)
+            logical = os.path.relpath(source, static_folder).replace(os.sep, "/")
+            if logical.startswith(USER_CONTENT):
+                continue
+            with open(source, "rb") as f:
+                data = f.read()
+            stem, ext = os.path.splitext(logical)
+            hashed = f"{DIST}/{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}"
+            target = os.path.join(static_folder, hashed)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target, "wb") as f:
+                f.write(data)
+            if ext.lower() in COMPRESSIBLE:
+                with open(target + ".gz", "wb") as f:
+                    f.write(gzip.compress(data, 9))
+                if brotli is not None:
+                    with open(target + ".br", "wb") as f:
+                        f.write(brotli.compress(data))
+            manifest[logical] = hashed
+
+    os.makedirs(dist, exist_ok=True)
+    with open(os.path.join(dist, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def load_manifest(static_folder):
+    try:
+        with open(os.path.join(static_folder, DIST, MANIFEST)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _hashed_static_url(endpoint, values):
+    if endpoint == "static" and values.get("filename") in _manifest:
+        values["filename"] = _manifest[values["filename"]]
+
+
+def _precompressed(filename):
+    """Return (path, encoding) of the best precompressed sibling the client accepts."""
+    accepted = request.accept_encodings
+    for suffix, encoding in ((".br", "br"), (".gz", "gzip")):
+        candidate = os.path.join(current_app.static_folder, filename + suffix)
+        if accepted[encoding] and os.path.isfile(candidate):
+            return filename + suffix, encoding
+    return filename, None
+
+
+def serve_static(filename):
+    immutable = filename.startswith(f"{DIST}/") or bool(_CONTENT_ADDRESSED.search(filename))
+    path, encoding = filename, None
+    if filename.startswith(f"{DIST}/"):
+        path, encoding = _precompressed(filename)
+
+    response = send_from_directory(
+        current_app.static_folder,
+        path,
+        mimetype=mimetypes.guess_type(filename)[0] or "application/octet-stream",
+        conditional=True,
+        etag=True,
+        max_age=ONE_YEAR if immutable else current_app.get_send_file_max_age(filename),
+    )
+    response.headers["Accept-Ranges"] = "bytes"
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    if filename.startswith(f"{DIST}/"):
+        response.vary.add("Accept-Encoding")
+    if immutable:
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+    return response
+
+
+def init_app(app):
+    global _manifest
+    _manifest = load_manifest(app.static_folder)
+    app.url_defaults(_hashed_static_url)
+    app.view_functions["static"] = serve_static
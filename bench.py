@@ -0,0 +1,259 @@
+"""Route benchmarks against a seeded database.
+
+``run_benchmarks(app)`` requests one representative URL per page and API
+endpoint through the Flask test client, as the kind of user who normally
+sees it, and records per route
+
+* ``p50_ms`` / ``p95_ms`` wall time over ``iterations`` requests (after a
+  warm-up request, so the numbers describe the steady state), and
+* ``cold_queries``: SQL statements executed by the first request, made
+  with the fragment, admin-stats and principal caches emptied, which is
+  what a cache miss costs, and
+* ``queries``: SQL statements executed by one warm request (the maximum
+  seen), which is what cached routes cost in the steady state.
+
+The result is a JSON document (``flask bench --output baseline.json``).
+``compare(current, baseline)`` lists routes that got slower than the
+tolerance allows or issue more queries, cold or warm, than before; ``flask bench
+--compare baseline.json`` exits non-zero when it finds any, which is what
+CI checks. Query counts are exact and machine independent; latency
+baselines are only meaningful on comparable hardware, so CI should
+record its own baseline.
+
+``check_query_counts()`` (``flask check-query-counts``) seeds fresh
+databases at two sizes and fails if any route issues a different number
+of statements on them: a count that grows with the data is an N+1.
+"""
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from cache import page_cache
+from models import db, User, Job, Project, Blog
+from queries import invalidate_admin_stats
+import principal
+
+LATENCY_TOLERANCE = 0.25   # allowed p50 slowdown, as a fraction of the baseline (twice that for p95)
+LATENCY_FLOOR_MS = 2.0     # ignore p50 slowdowns smaller than this (twice that for p95): timer noise
+QUERY_COUNT_SCALES = (0.002, 0.01)  # seed sizes check_query_counts compares (400 vs 2000 jobs)
+
+# (name, role, url); ids in the URL are filled in from the seeded data
+ROUTES = (
+    ("auth.index", None, "/"),
+    ("auth.index:student", "student", "/"),
+    ("blog.all_blogs", None, "/blog/all"),
+    ("explore.explore_home", None, "/explore/"),
+    ("search.search", None, "/search/?q=python"),
+    ("student.dashboard", "student", "/student/dashboard"),
+    ("student.job_detail", "student", "/student/job/{job_id}"),
+    ("student.portfolio", None, "/student/portfolio/{student_id}"),
+    ("student.earnings", "student", "/student/earnings"),
+    ("client.dashboard", "client", "/client/dashboard"),
+    ("client.spending", "client", "/client/spending"),
+    ("admin.admin_dashboard", "admin", "/admin/dashboard"),
+    ("admin.admin_analytics", "admin", "/admin/analytics"),
+    ("admin.manage_blogs", "admin", "/admin/blogs"),
+    ("admin.admin_verify", "admin", "/admin/verify"),
+    ("admin.view_user", "admin", "/admin/user/{student_id}"),
+    ("message.project_messages", "client", "/project/{project_id}/messages"),
+    ("message.poll_messages", "client", "/project/{project_id}/messages/poll"),
+    ("api.jobs", None, "/api/v1/jobs"),
+    ("api.job", None, "/api/v1/jobs/{job_id}"),
+    ("api.job_applications", "client", "/api/v1/jobs/{project_job_id}/applications"),
+    ("api.projects", "client", "/api/v1/projects"),
+    ("api.project_messages", "client", "/api/v1/projects/{project_id}/messages"),
+    ("api.blogs", None, "/api/v1/blogs"),
+    ("api.blog", None, "/api/v1/blogs/{blog_id}"),
+    ("api.student", None, "/api/v1/students/{student_id}"),
+)
+
+
+class _QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+
+def _sample(app):
+    """Pick the users and ids the routes are exercised with (the first verified project's)."""
+    with app.app_context():
+        project = db.session.execute(
+            db.select(Project.id, Project.job_id, Project.student_id, Project.client_id)
+            .join(User, User.id == Project.student_id)
+            .where(Project.verified.is_(True), User.status == "approved")
+            .order_by(Project.id)
+            .limit(1)
+        ).first()
+        if project is None:
+            raise RuntimeError("No verified project to benchmark with; run `flask seed-data` first")
+        admin_id = db.session.execute(
+            db.select(User.id).where(User.role == "Admin").order_by(User.id).limit(1)
+        ).scalar()
+        blog_id = db.session.execute(
+            db.select(Blog.id).where(Blog.status == "approved").order_by(Blog.id).limit(1)
+        ).scalar()
+        job_id = db.session.execute(
+            db.select(Job.id).where(Job.status == "open").order_by(Job.id).limit(1)
+        ).scalar()
+        users = db.session.execute(db.select(db.func.count(User.id))).scalar()
+        dialect = db.engine.dialect.name
+    return {
+        "database": dialect,
+        "user_count": users,
+        "users": {"admin": admin_id, "student": project.student_id, "client": project.client_id},
+        "ids": {"project_id": project.id, "project_job_id": project.job_id,
+                "job_id": job_id or project.job_id,
+                "student_id": project.student_id, "blog_id": blog_id or 0},
+    }
+
+
+def _percentile(samples, fraction):
+    ordered = sorted(samples)
+    index = max(0, math.ceil(fraction * len(ordered)) - 1)
+    return ordered[index]
+
+
+def _get(app, client, url):
+    # A fresh app context per request: requests inside the CLI's context would
+    # share ``g``, and with it Flask-Login's cached user
+    with app.app_context():
+        return client.get(url)
+
+
+def _clear_caches():
+    page_cache.backend.clear()
+    principal.clear()
+    invalidate_admin_stats()
+
+
+def run_benchmarks(app, iterations=20, only=None, log=print):
+    """Time every route in ``ROUTES``; returns the JSON-ready result document."""
+    sample = _sample(app)
+    client = app.test_client()
+    counter = _QueryCounter()
+    event.listen(Engine, "before_cursor_execute", counter)
+    results = {}
+    try:
+        for name, role, url in ROUTES:
+            if only and not any(name.startswith(prefix) for prefix in only):
+                continue
+            url = url.format(**sample["ids"])
+            with client.session_transaction() as session:
+                session.clear()
+                if role:
+                    session["_user_id"] = str(sample["users"][role])
+
+            # The cold request doubles as the warm-up: caches, compiled statements, templates
+            _clear_caches()
+            counter.count = 0
+            _get(app, client, url)
+            cold_queries = counter.count
+            timings = []
+            queries = 0
+            status = None
+            for _ in range(iterations):
+                counter.count = 0
+                start = time.perf_counter()
+                response = _get(app, client, url)
+                timings.append((time.perf_counter() - start) * 1000)
+                queries = max(queries, counter.count)
+                status = response.status_code
+
+            results[name] = {
+                "url": url,
+                "status": status,
+                "p50_ms": round(_percentile(timings, 0.5), 3),
+                "p95_ms": round(_percentile(timings, 0.95), 3),
+                "queries": queries,
+                "cold_queries": cold_queries,
+            }
+            log(f"{name:32} {status}  p50 {results[name]['p50_ms']:8.2f} ms  "
+                f"p95 {results[name]['p95_ms']:8.2f} ms  {queries:3} queries ({cold_queries} cold)")
+    finally:
+        event.remove(Engine, "before_cursor_execute", counter)
+
+    return {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+            "iterations": iterations,
+            "database": sample["database"],
+            "users": sample["user_count"],
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "routes": results,
+    }
+
+
+def _slower(now, before, tolerance, floor_ms):
+    return now > max(before * (1 + tolerance), before + floor_ms)
+
+
+def compare(current, baseline, tolerance=LATENCY_TOLERANCE, floor_ms=LATENCY_FLOOR_MS):
+    """Human-readable regressions of ``current`` against ``baseline`` (empty if none).
+
+    Query counts, cold and warm, must not grow at all. Latency is judged on p50 and, with
+    twice the slack since the tail is noisier, on p95.
+    """
+    problems = []
+    for name, now in current["routes"].items():
+        if now["status"] >= 400:
+            problems.append(f"{name}: responded {now['status']}")
+        before = baseline["routes"].get(name)
+        if before is None:
+            continue
+        for key in ("queries", "cold_queries"):
+            if key in before and now[key] > before[key]:
+                problems.append(f"{name}: {now[key]} {key.replace('_', ' ')} (baseline {before[key]})")
+        for key, slack in (("p50_ms", 1), ("p95_ms", 2)):
+            if _slower(now[key], before[key], tolerance * slack, floor_ms * slack):
+                problems.append(f"{name}: {key[:3]} {now[key]:.2f} ms (baseline {before[key]:.2f} ms)")
+    return problems
+
+
+# 🔹 Statement counts must not depend on the amount of data
+def _bench_seeded(scale, directory):
+    """Seed a fresh SQLite database at ``scale`` and benchmark it in a child process.
+
+    The engine URL is fixed when ``app`` is imported, so each database gets
+    its own ``flask`` process.
+    """
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(directory, 'seed.db')}",
+               CACHE_BACKEND="memory")
+    env.pop("DATABASE_REPLICA_URL", None)
+    output = os.path.join(directory, "bench.json")
+    flask = [sys.executable, "-m", "flask", "--app", "app"]
+    subprocess.run([*flask, "seed-data", "--scale", str(scale)], env=env, check=True,
+                   stdout=subprocess.DEVNULL)
+    subprocess.run([*flask, "bench", "--iterations", "1", "--output", output], env=env, check=True,
+                   stdout=subprocess.DEVNULL)
+    with open(output) as f:
+        return json.load(f)["routes"]
+
+
+def check_query_counts(scales=QUERY_COUNT_SCALES, log=print):
+    """Routes whose statement counts differ between databases seeded at ``scales``."""
+    runs = []
+    for scale in scales:
+        log(f"seeding and benchmarking scale {scale}")
+        with tempfile.TemporaryDirectory() as directory:
+            runs.append((scale, _bench_seeded(scale, directory)))
+
+    problems = []
+    (first_scale, first), *others = runs
+    for name, route in first.items():
+        for scale, routes in others:
+            for key in ("queries", "cold_queries"):
+                if routes[name][key] != route[key]:
+                    problems.append(f"{name}: {route[key]} {key.replace('_', ' ')} at scale {first_scale}, "
+                                    f"{routes[name][key]} at scale {scale}")
+    return problems
@@ -0,0 +1,239 @@
+"""Fragment cache for rendered HTML.
+
+Routes render their data-heavy fragments through :data:`page_cache`, keyed
+by fragment name, viewer role, request arguments and the current *data
+version* of every table the fragment reads. Committing a change to a
+Blog, Job, Project, Review or User bumps that table's version, so stale
+fragments simply stop being looked up and age out of the backend.
+Other derived data (skill-match rankings) is cached the same way through
+:meth:`FragmentCache.value`.
+
+Backends: ``memory`` (per-process LRU with TTL), ``filesystem`` (shared
+between worker processes on one host) and ``null`` (disabled).
+"""
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from flask_login import current_user
+from markupsafe import Markup
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from models import Blog, Job, Project, Review, User, primary_reads
+
+VERSIONED_MODELS = {Blog: "blog", Job: "job", Project: "project", Review: "review", User: "user"}
+
+
+class NullBackend:
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl=None):
+        pass
+
+    def clear(self):
+        pass
+
+
+class MemoryBackend:
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires is not None and expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class FileBackend:
+    SWEEP_EVERY = 100  # set() calls between size sweeps
+
+    def __init__(self, directory, max_entries=10000):
+        self.directory = directory
+        self.max_entries = max_entries
+        self._sets = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest())
+
+    @staticmethod
+    def _discard(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                expires, value = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, pickle.UnpicklingError):
+            self._discard(path)
+            return None
+        if expires is not None and expires < time.time():
+            self._discard(path)
+            return None
+        return value
+
+    def set(self, key, value, ttl=None):
+        expires = time.time() + ttl if ttl else None
+        fd, tmp = tempfile.mkstemp(dir=self.directory)
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump((expires, value), f)
+        os.replace(tmp, self._path(key))
+        self._sets += 1
+        if self._sets % self.SWEEP_EVERY == 0:
+            self.sweep()
+
+    def _files(self):
+        with os.scandir(self.directory) as entries:
+            return [entry for entry in entries if entry.is_file()]
+
+    def sweep(self):
+        """Delete the oldest files (by mtime) beyond ``max_entries``.
+
+        Entries superseded by a version bump are never read again, so
+        without this they would pile up; evicting a version file only
+        starts that namespace over with a fresh version.
+        """
+        files = []
+        for entry in self._files():
+            try:
+                files.append((entry.stat().st_mtime, entry.path))
+            except OSError:
+                continue
+        excess = len(files) - self.max_entries
+        if excess > 0:
+            files.sort()
+            for _, path in files[:excess]:
+                self._discard(path)
+
+    def clear(self):
+        for entry in self._files():
+            self._discard(entry.path)
+
+
+class FragmentCache:
+    def __init__(self, app=None):
+        self.backend = NullBackend()
+        self.default_ttl = 300
+        self.hits = 0
+        self.misses = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        kind = app.config.get("CACHE_BACKEND", "memory")
+        if kind == "memory":
+            self.backend = MemoryBackend(app.config.get("CACHE_MAX_ENTRIES", 1024))
+        elif kind == "filesystem":
+            self.backend = FileBackend(app.config.get("CACHE_DIR", os.path.join(app.instance_path, "cache")),
+                                       app.config.get("CACHE_DIR_MAX_ENTRIES", 10000))
+        elif kind == "null":
+            self.backend = NullBackend()
+        else:
+            raise ValueError(f"Unknown CACHE_BACKEND {kind!r}")
+        self.default_ttl = app.config.get("CACHE_DEFAULT_TTL", 300)
+        app.extensions["page_cache"] = self
+
+    # 🔹 Data versions
+    def version(self, namespace):
+        key = f"version:{namespace}"
+        value = self.backend.get(key)
+        if value is None:
+            # A fresh, never-before-seen value: an evicted version can't revive old entries
+            value = time.time_ns()
+            self.backend.set(key, value)
+        return value
+
+    def bump(self, namespace):
+        self.backend.set(f"version:{namespace}", time.time_ns())
+
+    # 🔹 Fragments and values
+    def fragment(self, name, depends_on, render, vary=(), ttl=None):
+        """Return cached HTML for ``name`` or call ``render()`` and store it.
+
+        ``depends_on`` lists table namespaces (see VERSIONED_MODELS) whose
+        changes invalidate the fragment; ``vary`` adds request-specific
+        key parts such as a cursor or a profile id.
+        """
+        role = current_user.role if current_user.is_authenticated else "anon"
+        html = self.value(f"fragment|{name}", depends_on, lambda: str(render()), (role, *vary), ttl)
+        return Markup(html)
+
+    def value(self, name, depends_on, compute, vary=(), ttl=None):
+        """Like :meth:`fragment` for any picklable value, without the viewer's role."""
+        versions = ",".join(f"{ns}={self.version(ns)}" for ns in depends_on)
+        key = "|".join([name, *map(str, vary), versions])
+
+        value = self.backend.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+        # Stored under the current versions, so compute it from up-to-date data
+        with primary_reads():
+            value = compute()
+        self.backend.set(key, value, ttl or self.default_ttl)
+        return value
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else None,
+        }
+
+
+page_cache = FragmentCache()
+
+
+# 🔹 Bump versions for every table touched by a committed transaction
+@event.listens_for(Session, "after_flush")
+def _collect_changed_tables(session, flush_context):
+    changed = session.info.setdefault("changed_namespaces", set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        namespace = VERSIONED_MODELS.get(type(obj))
+        if namespace:
+            changed.add(namespace)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_versions(session):
+    for namespace in session.info.pop("changed_namespaces", ()):
+        page_cache.bump(namespace)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_tables(session):
+    session.info.pop("changed_namespaces", None)
@@ -1,6 +1,77 @@
 import os
 
+
+def engine_options(uri):
+    """SQLAlchemy engine options suited to the database backend in ``uri``."""
+    if uri.startswith("sqlite"):
+        # Keep the defaults: file databases get SQLAlchemy's QueuePool (5 + 10 overflow,
+        # enough for gunicorn's 8 threads per worker), :memory: a single StaticPool
+        # connection. Pragmas are set per connection (models.py)
+        return {}
+    return {
+        "pool_size": int(os.environ.get("DB_POOL_SIZE", 5)),
+        "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", 10)),
+        "pool_timeout": int(os.environ.get("DB_POOL_TIMEOUT", 30)),   # seconds waiting for a connection
+        "pool_recycle": int(os.environ.get("DB_POOL_RECYCLE", 1800)),  # seconds, below server idle timeouts
+        "pool_pre_ping": True,
+    }
+
+
+def replica_binds(uri):
+    """``SQLALCHEMY_BINDS`` entry for a read-only replica, if one is configured."""
+    if not uri:
+        return {}
+    return {"replica": {"url": uri, **engine_options(uri)}}
+
+
 class Config:
     SECRET_KEY = os.environ.get("SECRET_KEY", "supersecret")
     SQLALCHEMY_DATABASE_URI = os.environ.get("DATABASE_URL", "sqlite:///sts.db")
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+    SQLALCHEMY_BINDS = replica_binds(os.environ.get("DATABASE_REPLICA_URL"))
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    INSTRUMENTATION = os.environ.get("INSTRUMENTATION", "1") == "1"  # timings, /metrics, slow log
+    SLOW_REQUEST_MS = int(os.environ.get("SLOW_REQUEST_MS", 500))
+    METRICS_TOKEN = os.environ.get("METRICS_TOKEN")  # /metrics with "Authorization: Bearer <token>"
+    METRICS_ALLOWED_IPS = tuple(os.environ.get("METRICS_ALLOWED_IPS", "127.0.0.1,::1").split(","))  # or from these
+    REPLICA_PIN_SECONDS = 10  # after a write, that browser reads from the primary this long
+    REPLICA_SYNC_INTERVAL = 2  # seconds between local SQLite replica copies (replica.py)
+    SQLITE_BUSY_TIMEOUT = 5000  # ms a writer waits for the lock before "database is locked"
+    SQLITE_MMAP_SIZE = 256 * 1024 * 1024  # bytes of the database file memory-mapped
+    ADMIN_STATS_TTL = int(os.environ.get("ADMIN_STATS_TTL", 30))  # seconds
+    PAGE_SIZE = int(os.environ.get("PAGE_SIZE", 20))
+    CHAT_KEEPALIVE = 15  # seconds between SSE keepalive comments
+    CHAT_STREAM_LIFETIME = int(os.environ.get("CHAT_STREAM_LIFETIME", 300))  # seconds before a stream closes
+    CHAT_STREAM_RETRY_MS = 2000  # reconnect delay sent to EventSource clients
+    CHAT_BATCH_SIZE = 100  # max messages per live-chat delta
+    CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "memory")  # memory, filesystem, null
+    CACHE_DIR = os.environ.get("CACHE_DIR", "instance/cache")
+    CACHE_DEFAULT_TTL = 300  # seconds
+    CACHE_MAX_ENTRIES = 1024  # memory backend, per process
+    CACHE_DIR_MAX_ENTRIES = 10000  # filesystem backend; oldest files are swept beyond this
+    USER_CACHE_SIZE = 4096  # logged-in users whose principal is kept per process
+    USER_CACHE_TTL = 60  # seconds; version bumps invalidate sooner
+    MAX_CONTENT_LENGTH = 32 * 1024 * 1024  # whole request body
+    UPLOAD_MAX_BYTES = 16 * 1024 * 1024  # per uploaded file
+    UPLOAD_WORKERS = 2  # background post-processing threads
+    IMAGE_WORKERS = 2  # processes resizing profile pictures
+    TASK_MAX_ATTEMPTS = 5  # then the task is dead-lettered
+    TASK_POLL_INTERVAL = 1.0  # seconds the worker sleeps when the queue is empty
+    TASK_LOCK_TIMEOUT = 300  # seconds before a running task is considered abandoned
+    TASK_RETENTION_DAYS = 7  # finished tasks without an idempotency key are purged after this
+    MAIL_SERVER = os.environ.get("MAIL_SERVER")  # unset: emails are only logged
+    MAIL_PORT = int(os.environ.get("MAIL_PORT", 25))
+    MAIL_SENDER = os.environ.get("MAIL_SENDER", "noreply@localhost")
+
+
+class ProductionConfig(Config):
+    """Settings for gunicorn/uvicorn workers; select with ``APP_CONFIG=config.ProductionConfig``."""
+    DEBUG = False
+    SECRET_KEY = os.environ.get("SECRET_KEY")  # required, checked in wsgi.py
+    SESSION_COOKIE_SECURE = True
+    SESSION_COOKIE_HTTPONLY = True
+    REMEMBER_COOKIE_SECURE = True
+    PREFERRED_URL_SCHEME = "https"
+    # Workers are separate processes: share cache data versions through the filesystem
+    CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "filesystem")
+    SQLITE_BUSY_TIMEOUT = int(os.environ.get("SQLITE_BUSY_TIMEOUT", 15000))
@@ -0,0 +1,57 @@
+"""EXPLAIN QUERY PLAN checks for the route queries (SQLite only).
+
+Run ``flask check-query-plans``; it lists every route query whose plan
+falls back to a full table scan and exits non-zero if any does.
+"""
+from models import db, Application, Blog, Project, User
+from queries import (
+    all_projects_query, blogs_by_status_query, client_jobs_query,
+    client_projects_query, job_applications_query, open_jobs_query,
+    project_messages_query, student_projects_query, verified_projects_query,
+)
+
+
+def _route_queries():
+    """Representative queries issued by the routes, keyed by a readable label."""
+    project = Project(id=1)
+    return {
+        "auth.login user lookup": User.query.filter_by(username="admin"),
+        "open jobs": open_jobs_query().limit(20),
+        "client jobs": client_jobs_query(1),
+        "client projects": client_projects_query(1),
+        "student projects": student_projects_query(1),
+        "portfolio projects": verified_projects_query(1),
+        "job applications": job_applications_query(1).order_by(Application.created_at.desc()).limit(20),
+        "existing application": Application.query.filter_by(job_id=1, student_id=1),
+        # The keyset page auth.index and blog.all_blogs render
+        "approved blogs": blogs_by_status_query("approved").order_by(None)
+        .order_by(Blog.created_at.desc(), Blog.id.desc()).limit(20),
+        "project messages": project_messages_query(project).limit(20),
+        "admin verify": Project.query.filter(
+            Project.approval_code != None, Project.verified == False, Project.status == "submitted"
+        ),
+        "pending users": User.query.filter_by(status="pending"),
+        "analytics projects page": all_projects_query().order_by(None)
+        .order_by(Project.created_at.desc(), Project.id.desc()).limit(20),
+    }
+
+
+def _full_scans(query):
+    statement = query.statement.compile(db.engine, compile_kwargs={"literal_binds": True})
+    rows = db.session.execute(db.text(f"EXPLAIN QUERY PLAN {statement}")).all()
+    scans = []
+    for row in rows:
+        detail = row[-1]
+        if detail.startswith("SCAN ") and "USING" not in detail:
+            scans.append(detail)
+    return scans
+
+
+def check_query_plans():
+    """Return ``{label: [scan details]}`` for route queries that scan a whole table."""
+    failures = {}
+    for label, query in _route_queries().items():
+        scans = _full_scans(query)
+        if scans:
+            failures[label] = scans
+    return failures
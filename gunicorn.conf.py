@@ -0,0 +1,21 @@
+# gunicorn settings for `gunicorn wsgi:app`; each value can be overridden from the environment
+import multiprocessing
+import os
+
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+# Threaded workers: an open chat stream (SSE) holds one thread, not a whole process.
+# workers * threads still caps concurrent streams and requests together, so streams
+# close after CHAT_STREAM_LIFETIME and the browser reconnects, freeing the thread
+worker_class = "gthread"
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get("WEB_THREADS", 8))
+timeout = 60
+graceful_timeout = 30
+keepalive = 5
+# Recycle workers now and then to bound memory growth
+max_requests = 2000
+max_requests_jitter = 200
+# Don't preload: each worker opens its own connection pools and background executors
+preload_app = False
+accesslog = "-"
+errorlog = "-"
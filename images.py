@@ -0,0 +1,98 @@
+"""Resized WebP variants of profile pictures.
+
+After a profile picture upload commits, the upload pool hands the file to
+a process pool that writes fixed-width WebP variants next to it under
+``static/uploads/variants/``. Their paths are stored as JSON on
+``User.profile_pic_variants`` and rendered through the
+``profile_pic_url`` / ``profile_pic_srcset`` template helpers. Without
+Pillow installed, pictures are simply served as uploaded.
+"""
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from flask import url_for
+from models import db, User
+from uploads import STATIC_ROOT, register_processor
+
+VARIANT_WIDTHS = (64, 160, 320)
+VARIANT_FOLDER = "uploads/variants"
+
+log = logging.getLogger(__name__)
+
+_pool = None
+
+
+def _get_pool(app):
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=app.config.get("IMAGE_WORKERS", 2))
+    return _pool
+
+
+def make_variants(path, widths=VARIANT_WIDTHS):
+    """Write square WebP crops of ``static/<path>``; returns ``{width: path}``.
+
+    Runs in a worker process, so it only touches the filesystem.
+    """
+    from PIL import Image, ImageOps
+
+    stem = os.path.splitext(os.path.basename(path))[0]
+    os.makedirs(os.path.join(STATIC_ROOT, VARIANT_FOLDER), exist_ok=True)
+    variants = {}
+    with Image.open(os.path.join(STATIC_ROOT, path)) as source:
+        image = ImageOps.exif_transpose(source).convert("RGB")
+        for width in widths:
+            relative = f"{VARIANT_FOLDER}/{stem}_{width}.webp"
+            target = os.path.join(STATIC_ROOT, relative)
+            if not os.path.exists(target):
+                ImageOps.fit(image, (width, width), Image.LANCZOS).save(target, "WEBP", quality=80, method=4)
+            variants[str(width)] = relative
+    return variants
+
+
+def process_profile_pic(app, path):
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        log.warning("Pillow is not installed; skipping variants for %s", path)
+        return
+    variants = _get_pool(app).submit(make_variants, path).result()
+    User.query.filter_by(profile_pic=path).update(
+        {"profile_pic_variants": json.dumps(variants)}, synchronize_session=False
+    )
+    db.session.commit()
+
+
+register_processor("profile_pic", process_profile_pic)
+
+
+# 🔹 Template helpers
+def _variants(user):
+    try:
+        return json.loads(user.profile_pic_variants or "{}")
+    except ValueError:
+        return {}
+
+
+def profile_pic_url(user, width=None):
+    """URL of the smallest variant at least ``width`` wide, else the original."""
+    variants = _variants(user)
+    if width is not None:
+        for w in sorted(map(int, variants)):
+            if w >= width:
+                return url_for("static", filename=variants[str(w)])
+    return url_for("static", filename=user.profile_pic or "default_avatar.png")
+
+
+def profile_pic_srcset(user):
+    """``srcset`` value listing every variant, or "" when none exist yet."""
+    variants = _variants(user)
+    return ", ".join(
+        f"{url_for('static', filename=variants[w])} {w}w" for w in sorted(variants, key=int)
+    )
+
+
+def init_app(app):
+    app.add_template_global(profile_pic_url)
+    app.add_template_global(profile_pic_srcset)
@@ -0,0 +1,267 @@
+"""Per-request performance instrumentation.
+
+For every request this records wall time, the number of SQL statements
+and the time spent in them (engine cursor events), and Jinja render time
+(Flask's template signals). SQLite does most of a query's work while the
+rows are stepped through, after ``cursor.execute`` returns, so SQLite
+engines get a cursor that also times ``fetchone``/``fetchmany``/
+``fetchall``; DB time is execute plus fetch. (Other drivers used here
+buffer the whole result inside ``execute``.) The numbers are
+
+* sent back in a ``Server-Timing`` header (visible in browser devtools),
+* aggregated per endpoint and served in Prometheus text format at
+  ``/metrics`` (per worker process; only to ``METRICS_ALLOWED_IPS`` or
+  with ``Authorization: Bearer <METRICS_TOKEN>``), and
+* logged, with the slowest statements, when a request takes longer than
+  ``SLOW_REQUEST_MS``.
+
+The hot path is two ``perf_counter()`` calls and a list append per SQL
+statement, plus two per fetch call on SQLite; set ``INSTRUMENTATION =
+False`` to disable it entirely.
+"""
+import bisect
+import hmac
+import logging
+import sqlite3
+import threading
+import time
+from contextvars import ContextVar
+from flask import Response, abort, before_render_template, current_app, request, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+log = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MAX_STATEMENTS = 200  # kept per request for the slow log
+
+# A context variable rather than flask.g: it is read on every SQL statement
+_current = ContextVar("request_stats", default=None)
+
+
+class RequestStats:
+    __slots__ = ("start", "sql_count", "sql_time", "fetch_time", "statements",
+                 "render_time", "render_depth", "render_start")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.sql_count = 0
+        self.sql_time = 0.0    # execute and fetch
+        self.fetch_time = 0.0  # the fetch part of sql_time
+        self.statements = []
+        self.render_time = 0.0
+        self.render_depth = 0
+        self.render_start = 0.0
+
+
+class EndpointTotals:
+    __slots__ = ("buckets", "duration", "sql_count", "sql_time", "render_time")
+
+    def __init__(self):
+        self.buckets = [0] * (len(DURATION_BUCKETS) + 1)  # last one is +Inf
+        self.duration = 0.0
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.render_time = 0.0
+
+
+class Metrics:
+    """Per-endpoint counters and a request duration histogram, in process memory."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = {}     # (endpoint, method, status) -> count
+        self.endpoints = {}    # endpoint -> EndpointTotals
+
+    def observe(self, endpoint, method, status, stats, elapsed):
+        index = bisect.bisect_left(DURATION_BUCKETS, elapsed)
+        with self._lock:
+            key = (endpoint, method, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            totals = self.endpoints.get(endpoint)
+            if totals is None:
+                totals = self.endpoints[endpoint] = EndpointTotals()
+            totals.buckets[index] += 1
+            totals.duration += elapsed
+            totals.sql_count += stats.sql_count
+            totals.sql_time += stats.sql_time
+            totals.render_time += stats.render_time
+
+    def render(self):
+        with self._lock:
+            requests = sorted(self.requests.items())
+            endpoints = sorted(
+                (name, list(t.buckets), t.duration, t.sql_count, t.sql_time, t.render_time)
+                for name, t in self.endpoints.items()
+            )
+
+        lines = [
+            "# HELP http_requests_total Requests handled, by endpoint, method and status.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (endpoint, method, status), count in requests:
+            lines.append(f'http_requests_total{{endpoint="{endpoint}",method="{method}",status="{status}"}} {count}')
+
+        lines += [
+            "# HELP http_request_duration_seconds Wall time per request.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for endpoint, buckets, duration, *_ in endpoints:
+            cumulative = 0
+            for bound, count in zip(DURATION_BUCKETS, buckets):
+                cumulative += count
+                lines.append(f'http_request_duration_seconds_bucket{{endpoint="{endpoint}",le="{bound}"}} {cumulative}')
+            cumulative += buckets[-1]
+            lines.append(f'http_request_duration_seconds_bucket{{endpoint="{endpoint}",le="+Inf"}} {cumulative}')
+            lines.append(f'http_request_duration_seconds_sum{{endpoint="{endpoint}"}} {duration:.6f}')
+            lines.append(f'http_request_duration_seconds_count{{endpoint="{endpoint}"}} {cumulative}')
+
+        for index, name, help_text in (
+            (3, "db_statements_total", "SQL statements executed."),
+            (4, "db_duration_seconds_total", "Time spent executing SQL and fetching rows."),
+            (5, "template_render_seconds_total", "Time spent rendering Jinja templates."),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            for row in endpoints:
+                value = row[index] if index == 3 else f"{row[index]:.6f}"
+                lines.append(f'{name}{{endpoint="{row[0]}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+# 🔹 SQL timing, for every engine (primary and replica)
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    stats = _current.get()
+    if stats is None:
+        return
+    stats.sql_count += 1
+    stats.sql_time += elapsed
+    if len(stats.statements) < MAX_STATEMENTS:
+        stats.statements.append((elapsed, statement))
+
+
+class TimedCursor(sqlite3.Cursor):
+    """Adds time spent fetching rows to the current request's DB time."""
+
+    def _timed(self, fetch, *args):
+        stats = _current.get()
+        if stats is None:
+            return fetch(*args)
+        start = time.perf_counter()
+        try:
+            return fetch(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            stats.sql_time += elapsed
+            stats.fetch_time += elapsed
+
+    def fetchone(self):
+        return self._timed(super().fetchone)
+
+    def fetchmany(self, *args):
+        return self._timed(super().fetchmany, *args)
+
+    def fetchall(self):
+        return self._timed(super().fetchall)
+
+
+class TimedConnection(sqlite3.Connection):
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+
+def _with_fetch_timing(options, uri):
+    """Engine options for ``uri`` with :class:`TimedConnection` connections if it is SQLite."""
+    if not uri or not uri.startswith("sqlite"):
+        return options
+    return {**options, "connect_args": {**options.get("connect_args", {}), "factory": TimedConnection}}
+
+
+# 🔹 Jinja render timing (outermost render only, so nested renders aren't counted twice)
+def _before_render(sender, template, context, **extra):
+    stats = _current.get()
+    if stats is not None:
+        if stats.render_depth == 0:
+            stats.render_start = time.perf_counter()
+        stats.render_depth += 1
+
+
+def _after_render(sender, template, context, **extra):
+    stats = _current.get()
+    if stats is not None and stats.render_depth:
+        stats.render_depth -= 1
+        if stats.render_depth == 0:
+            stats.render_time += time.perf_counter() - stats.render_start
+
+
+def _start_request():
+    _current.set(RequestStats())
+
+
+def _end_request(exc=None):
+    _current.set(None)
+
+
+def _finish_request(response):
+    stats = _current.get()
+    if stats is None:
+        return response
+    elapsed = time.perf_counter() - stats.start
+    endpoint = request.endpoint or "unmatched"
+
+    response.headers.add(
+        "Server-Timing",
+        f'db;dur={stats.sql_time * 1000:.1f};desc="{stats.sql_count} queries", '
+        f"render;dur={stats.render_time * 1000:.1f}, "
+        f"total;dur={elapsed * 1000:.1f}",
+    )
+    metrics.observe(endpoint, request.method, response.status_code, stats, elapsed)
+
+    if elapsed * 1000 >= current_app.config.get("SLOW_REQUEST_MS", 500):
+        slowest = sorted(stats.statements, key=lambda item: item[0], reverse=True)[:5]
+        log.warning(
+            "Slow request %s %s (%s): %.0f ms total, %d queries in %.0f ms (%.0f ms fetching rows), "
+            "render %.0f ms\n%s",
+            request.method, request.path, endpoint, elapsed * 1000, stats.sql_count,
+            stats.sql_time * 1000, stats.fetch_time * 1000, stats.render_time * 1000,
+            "\n".join(f"  {duration * 1000:.1f} ms: {' '.join(sql.split())[:500]}" for duration, sql in slowest),
+        )
+    return response
+
+
+def metrics_view():
+    token = current_app.config.get("METRICS_TOKEN")
+    supplied = request.headers.get("Authorization", "")
+    if not (token and hmac.compare_digest(supplied.encode(), f"Bearer {token}".encode())) \
+            and request.remote_addr not in current_app.config.get("METRICS_ALLOWED_IPS", ()):
+        abort(403)
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+
+def init_app(app):
+    """Call before ``db.init_app``: SQLite engines are created with timed cursors."""
+    if not app.config.get("INSTRUMENTATION", True):
+        return
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = _with_fetch_timing(
+        app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {}), app.config.get("SQLALCHEMY_DATABASE_URI")
+    )
+    app.config["SQLALCHEMY_BINDS"] = {
+        key: _with_fetch_timing(bind, bind.get("url")) if isinstance(bind, dict) else bind
+        for key, bind in app.config.get("SQLALCHEMY_BINDS", {}).items()
+    }
+    if not event.contains(Engine, "after_cursor_execute", _after_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.teardown_request(_end_request)
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_after_render, app)
+    app.add_url_rule("/metrics", "metrics", metrics_view)
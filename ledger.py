@@ -0,0 +1,144 @@
+"""Materialized earnings ledger.
+
+``earnings_month`` holds one row per (user, kind, month) with the total
+and count of completed payments: ``earned`` rows for the payee and
+``spent`` rows for the payer. The Payment events below keep it in step
+inside the same flush as the payment itself, so dashboards read a single
+primary-key row instead of scanning payments, and history views read at
+most twelve rows per user.
+"""
+from datetime import date, datetime
+from sqlalchemy import event, inspect
+from models import db, EarningsMonth, Payment
+
+
+def month_key(when):
+    return when.year * 100 + when.month
+
+
+def _contributions(status, amount, payer_id, payee_id, created_at):
+    """Ledger entries ``(user_id, kind, month, amount)`` for one payment state."""
+    if status != "completed" or not amount or created_at is None:
+        return []
+    month = month_key(created_at)
+    entries = []
+    if payee_id is not None:
+        entries.append((payee_id, "earned", month, amount))
+    if payer_id is not None:
+        entries.append((payer_id, "spent", month, amount))
+    return entries
+
+
+def _apply(connection, entries, sign):
+    table = EarningsMonth.__table__
+    for user_id, kind, month, amount in entries:
+        key = (table.c.user_id == user_id) & (table.c.kind == kind) & (table.c.month == month)
+        updated = connection.execute(
+            table.update()
+            .where(key)
+            .values(total=table.c.total + sign * amount,
+                    payment_count=table.c.payment_count + sign)
+        ).rowcount
+        if not updated and sign > 0:
+            connection.execute(
+                table.insert().values(user_id=user_id, kind=kind, month=month,
+                                      total=amount, payment_count=1)
+            )
+        elif sign < 0:
+            connection.execute(table.delete().where(key & (table.c.payment_count <= 0)))
+
+
+def _current(target):
+    return _contributions(target.status, target.amount, target.payer_id,
+                          target.payee_id, target.created_at)
+
+
+@event.listens_for(Payment, "after_insert")
+def _payment_inserted(mapper, connection, target):
+    _apply(connection, _current(target), 1)
+
+
+@event.listens_for(Payment, "after_update")
+def _payment_updated(mapper, connection, target):
+    state = inspect(target)
+    fields = ("status", "amount", "payer_id", "payee_id", "created_at")
+    histories = {name: state.attrs[name].history for name in fields}
+    if not any(h.has_changes() for h in histories.values()):
+        return
+    old = {
+        name: h.deleted[0] if h.deleted else getattr(target, name)
+        for name, h in histories.items()
+    }
+    _apply(connection, _contributions(**old), -1)
+    _apply(connection, _current(target), 1)
+
+
+@event.listens_for(Payment, "after_delete")
+def _payment_deleted(mapper, connection, target):
+    _apply(connection, _current(target), -1)
+
+
+# 🔹 Views
+def month_total(user_id, kind, when=None):
+    """Completed total for one month (default: this month); a primary-key lookup."""
+    row = db.session.get(EarningsMonth, (user_id, kind, month_key(when or datetime.utcnow())))
+    return row.total if row else 0
+
+
+def monthly_history(user_id, kind, months=12, when=None):
+    """``[(first_of_month, total, count)]`` for the last ``months`` months, oldest first."""
+    when = when or datetime.utcnow()
+    year, month = when.year, when.month
+    keys = []
+    for _ in range(months):
+        keys.append((year, month))
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    keys.reverse()
+
+    first = keys[0][0] * 100 + keys[0][1]
+    rows = {
+        row.month: row
+        for row in EarningsMonth.query.filter(
+            EarningsMonth.user_id == user_id,
+            EarningsMonth.kind == kind,
+            EarningsMonth.month >= first,
+        )
+    }
+    history = []
+    for y, m in keys:
+        row = rows.get(y * 100 + m)
+        history.append((date(y, m, 1), row.total if row else 0, row.payment_count if row else 0))
+    return history
+
+
+def lifetime_total(user_id, kind):
+    """``(total, count)`` over every month on record."""
+    total, count = db.session.execute(
+        db.select(
+            db.func.coalesce(db.func.sum(EarningsMonth.total), 0),
+            db.func.coalesce(db.func.sum(EarningsMonth.payment_count), 0),
+        ).where(EarningsMonth.user_id == user_id, EarningsMonth.kind == kind)
+    ).one()
+    return total, count
+
+
+def rebuild_ledger():
+    """Recompute every ledger row from the payments table."""
+    totals = {}
+    payments = db.session.execute(
+        db.select(Payment.status, Payment.amount, Payment.payer_id,
+                  Payment.payee_id, Payment.created_at)
+        .where(Payment.status == "completed")
+    )
+    for payment in payments:
+        for user_id, kind, month, amount in _contributions(*payment):
+            total, count = totals.get((user_id, kind, month), (0, 0))
+            totals[(user_id, kind, month)] = (total + amount, count + 1)
+
+    db.session.execute(db.delete(EarningsMonth))
+    db.session.add_all(
+        EarningsMonth(user_id=user_id, kind=kind, month=month, total=total, payment_count=count)
+        for (user_id, kind, month), (total, count) in totals.items()
+    )
+    db.session.commit()
+    return len(totals)
@@ -0,0 +1,306 @@
+"""Skill-based matching between students and open jobs.
+
+Student skills/bio and job title/description are tokenized into sparse,
+L2-normalised term vectors stored in ``term_vector``; ``term_stat`` keeps
+each term's document frequency. Vectors and frequencies are rewritten by
+mapper events whenever the source text changes.
+
+Ranking is a sparse dot product computed in SQL. The query vector is
+reweighted by IDF against the other side's vectors, so filler words that
+appear in nearly every job ("design", "team", "deliver") count for
+almost nothing, and only its ``MAX_QUERY_TERMS`` strongest terms are
+used. Each of those reads at most ``MAX_POSTINGS`` postings, strongest
+first, from the ``(kind, term, weight)`` index. The cost is bounded by
+those two constants, not by the number of jobs or students, at the price
+of an approximate top-k: an entity that is weak on every query term can
+be missed. Results are cached per entity under the job and user data
+versions.
+"""
+import math
+import re
+from collections import Counter
+from functools import lru_cache
+from sqlalchemy import event, inspect, text
+from sqlalchemy.orm import joinedload, undefer, undefer_group
+from cache import page_cache
+from models import db, User, Job, TermStat, TermVector
+
+STOPWORDS = frozenset("""
+    a an and are as at be by for from has have i in is it its of on or our that the
+    this to was we will with you your able work working need looking experience
+""".split())
+
+MAX_TERMS = 64           # stored per vector
+MAX_QUERY_TERMS = 8      # strongest IDF-weighted terms a ranking query uses
+MAX_POSTINGS = 500       # postings read per query term, strongest first
+DOCUMENTS = ""           # term_stat row counting the vectors of a kind
+JOB_FIELDS = ("title", "description")
+STUDENT_FIELDS = ("skills", "bio")
+
+
+def tokenize(*texts):
+    counts = Counter()
+    for value in texts:
+        for word in re.findall(r"[a-z0-9+#.]+", (value or "").lower()):
+            word = word.strip(".")
+            if len(word) > 1 and word not in STOPWORDS:
+                counts[word[:64]] += 1
+    return counts
+
+
+def vectorize(counts):
+    """Sublinear tf weights, truncated to the strongest terms and L2-normalised."""
+    weights = {term: 1.0 + math.log(n) for term, n in counts.most_common(MAX_TERMS)}
+    norm = math.sqrt(sum(w * w for w in weights.values()))
+    if not norm:
+        return {}
+    return {term: w / norm for term, w in weights.items()}
+
+
+def _store_vector(connection, kind, entity_id, vector):
+    table = TermVector.__table__
+    connection.execute(
+        table.delete().where(table.c.kind == kind, table.c.entity_id == entity_id)
+    )
+    if vector:
+        connection.execute(
+            table.insert(),
+            [{"kind": kind, "entity_id": entity_id, "term": t, "weight": w} for t, w in vector.items()],
+        )
+
+
+def _count_terms(connection, kind, terms, sign):
+    """Add ``sign`` to the document frequency of ``terms``."""
+    if not terms:
+        return
+    table = TermStat.__table__
+    if sign > 0:
+        existing = set(connection.execute(
+            db.select(table.c.term).where(table.c.kind == kind, table.c.term.in_(terms))
+        ).scalars())
+        missing = [t for t in terms if t not in existing]
+        if missing:
+            connection.execute(table.insert(), [{"kind": kind, "term": t, "df": 0} for t in missing])
+    connection.execute(
+        table.update()
+        .where(table.c.kind == kind, table.c.term.in_(terms))
+        .values(df=table.c.df + sign)
+    )
+
+
+def _write_vector(connection, kind, entity_id, vector):
+    table = TermVector.__table__
+    old = set(connection.execute(
+        db.select(table.c.term).where(table.c.kind == kind, table.c.entity_id == entity_id)
+    ).scalars())
+    _store_vector(connection, kind, entity_id, vector)
+    new = set(vector)
+    documents = bool(new) - bool(old)
+    _count_terms(connection, kind, sorted(old - new) + ([DOCUMENTS] if documents < 0 else []), -1)
+    _count_terms(connection, kind, sorted(new - old) + ([DOCUMENTS] if documents > 0 else []), 1)
+
+
+def discard_vectors(connection, kind, entity_ids):
+    """Delete the vectors of ``entity_ids`` (a list or a SELECT of ids) with set-based statements.
+
+    For bulk deletes of the source rows, which skip the mapper events.
+    """
+    stats = TermStat.__table__
+    vectors = TermVector.__table__
+    selected = (vectors.c.kind == kind) & vectors.c.entity_id.in_(entity_ids)
+    removed = (
+        db.select(db.func.count())
+        .where(selected, vectors.c.term == stats.c.term)
+        .scalar_subquery()
+    )
+    connection.execute(
+        stats.update()
+        .where(stats.c.kind == kind, stats.c.term.in_(db.select(vectors.c.term).where(selected)))
+        .values(df=stats.c.df - removed)
+    )
+    connection.execute(
+        stats.update()
+        .where(stats.c.kind == kind, stats.c.term == DOCUMENTS)
+        .values(df=stats.c.df - db.select(db.func.count(db.distinct(vectors.c.entity_id)))
+                .where(selected).scalar_subquery())
+    )
+    connection.execute(vectors.delete().where(selected))
+
+
+def _recount_terms(connection):
+    """Rebuild ``term_stat`` from the stored vectors."""
+    stats = TermStat.__table__
+    vectors = TermVector.__table__
+    connection.execute(stats.delete())
+    connection.execute(stats.insert().from_select(
+        ["kind", "term", "df"],
+        db.select(vectors.c.kind, vectors.c.term, db.func.count()).group_by(vectors.c.kind, vectors.c.term),
+    ))
+    connection.execute(stats.insert().from_select(
+        ["kind", "term", "df"],
+        db.select(vectors.c.kind, db.literal(DOCUMENTS), db.func.count(db.distinct(vectors.c.entity_id)))
+        .group_by(vectors.c.kind),
+    ))
+
+
+def job_vector(job):
+    return vectorize(tokenize(job.title, job.description))
+
+
+def student_vector(user):
+    # Skills are the strongest signal, so count them twice
+    return vectorize(tokenize(user.skills, user.skills, user.bio))
+
+
+# 🔹 Incremental maintenance
+def _changed(target, fields):
+    state = inspect(target)
+    return any(state.attrs[f].history.has_changes() for f in fields)
+
+
+@event.listens_for(Job, "after_insert")
+def _job_inserted(mapper, connection, target):
+    _write_vector(connection, "job", target.id, job_vector(target))
+
+
+@event.listens_for(Job, "after_update")
+def _job_updated(mapper, connection, target):
+    if _changed(target, JOB_FIELDS):
+        _write_vector(connection, "job", target.id, job_vector(target))
+
+
+@event.listens_for(User, "after_insert")
+def _user_inserted(mapper, connection, target):
+    if target.role == "Student":
+        _write_vector(connection, "student", target.id, student_vector(target))
+
+
+@event.listens_for(User, "after_update")
+def _user_updated(mapper, connection, target):
+    if target.role == "Student" and _changed(target, STUDENT_FIELDS):
+        _write_vector(connection, "student", target.id, student_vector(target))
+
+
+@event.listens_for(Job, "after_delete")
+def _job_deleted(mapper, connection, target):
+    _write_vector(connection, "job", target.id, {})
+
+
+@event.listens_for(User, "after_delete")
+def _user_deleted(mapper, connection, target):
+    _write_vector(connection, "student", target.id, {})
+
+
+def rebuild_vectors():
+    """Recompute every job and student vector, and the term frequencies, from scratch."""
+    connection = db.session.connection()
+    connection.execute(TermVector.__table__.delete())
+    for job in Job.query.options(undefer(Job.description)).yield_per(500):
+        _store_vector(connection, "job", job.id, job_vector(job))
+    for user in User.query.filter_by(role="Student").options(undefer_group("profile")).yield_per(500):
+        _store_vector(connection, "student", user.id, student_vector(user))
+    _recount_terms(connection)
+    db.session.commit()
+
+
+# 🔹 Ranking
+# One UNION ALL member per query term. CROSS JOIN pins SQLite's join order:
+# walk the term's postings down the (kind, term, weight) index and stop
+# after :postings open jobs / approved students.
+_POSTINGS = {
+    "job": """
+        SELECT * FROM (
+            SELECT v.entity_id, v.weight * :weight{i} AS score
+            FROM term_vector AS v
+            CROSS JOIN job
+            WHERE v.kind = 'job' AND v.term = :term{i}
+              AND job.id = v.entity_id AND job.status = 'open'
+            ORDER BY v.weight DESC
+            LIMIT :postings
+        )""",
+    "student": """
+        SELECT * FROM (
+            SELECT v.entity_id, v.weight * :weight{i} AS score
+            FROM term_vector AS v
+            CROSS JOIN "user"
+            WHERE v.kind = 'student' AND v.term = :term{i}
+              AND "user".id = v.entity_id AND "user".status = 'approved'
+            ORDER BY v.weight DESC
+            LIMIT :postings
+        )""",
+}
+
+
+@lru_cache(maxsize=None)
+def _rank_statement(kind, terms):
+    postings = "\n        UNION ALL".join(_POSTINGS[kind].format(i=i) for i in range(terms))
+    return text(f"""
+        SELECT entity_id, SUM(score) AS score
+        FROM ({postings})
+        GROUP BY entity_id
+        ORDER BY score DESC, entity_id DESC
+        LIMIT :limit
+    """)
+
+
+def _query_vector(kind, entity_id, target):
+    """The entity's vector reweighted by IDF among ``target`` vectors and cut to its strongest terms."""
+    vector = dict(db.session.execute(
+        db.select(TermVector.term, TermVector.weight)
+        .where(TermVector.kind == kind, TermVector.entity_id == entity_id)
+    ).all())
+    if not vector:
+        return {}
+    frequencies = dict(db.session.execute(
+        db.select(TermStat.term, TermStat.df)
+        .where(TermStat.kind == target, TermStat.term.in_([DOCUMENTS, *vector]))
+    ).all())
+    documents = frequencies.pop(DOCUMENTS, 0)
+    weights = {}
+    for term, weight in vector.items():
+        df = frequencies.get(term)
+        if df:  # no target vector has it: it can't score
+            weights[term] = weight * math.log((documents + 1) / df)
+    strongest = sorted(
+        ((t, w) for t, w in weights.items() if w > 0), key=lambda item: (-item[1], item[0])
+    )[:MAX_QUERY_TERMS]
+    if not strongest:
+        return {}
+    # Unit length, so scores stay cosine similarities in [0, 1]
+    norm = math.sqrt(sum(w * w for _, w in strongest))
+    return {term: w / norm for term, w in strongest}
+
+
+def _rank(kind, target, entity_id, limit):
+    """``[(id, score)]`` of the ``target`` entities closest to one ``kind`` entity."""
+    query = _query_vector(kind, entity_id, target)
+    if not query:
+        return []
+    params = {"postings": MAX_POSTINGS, "limit": limit}
+    for i, (term, weight) in enumerate(query.items()):
+        params[f"term{i}"] = term
+        params[f"weight{i}"] = weight
+    rows = db.session.execute(_rank_statement(target, len(query)), params).all()
+    return [tuple(row) for row in rows]
+
+
+def _ranked(scores, model, options=()):
+    if not scores:
+        return []
+    ids = [entity_id for entity_id, _ in scores]
+    by_id = {obj.id: obj for obj in model.query.options(*options).filter(model.id.in_(ids))}
+    return [(by_id[i], score) for i, score in scores if i in by_id]
+
+
+def recommended_jobs(student_id, limit=10):
+    """``[(job, score)]`` of open jobs closest to the student's skills."""
+    scores = page_cache.value("recommended-jobs", ["job", "user"],
+                              lambda: _rank("student", "job", student_id, limit), vary=(student_id, limit))
+    return _ranked(scores, Job, (joinedload(Job.client),))
+
+
+def candidate_students(job_id, limit=10):
+    """``[(student, score)]`` of approved students closest to the job."""
+    scores = page_cache.value("candidate-students", ["job", "user"],
+                              lambda: _rank("job", "student", job_id, limit), vary=(job_id, limit))
+    return _ranked(scores, User)
@@ -51,6 +51,21 @@ def get_metadata():
     return target_db.metadata
 
 
+# The SQLite FTS5 search tables (and the shadow tables FTS5 keeps for each)
+# are created by search.rebuild_search_index, not by the models; without this
+# autogenerate would emit drop_table for every one of them
+FTS_SHADOW_SUFFIXES = ("", "_data", "_idx", "_docsize", "_config", "_content")
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    from search import FTS_TABLES
+    if type_ == "table" and any(
+        name == fts + suffix for fts in FTS_TABLES for suffix in FTS_SHADOW_SUFFIXES
+    ):
+        return False
+    return True
+
+
 def run_migrations_offline():
     """Run migrations in 'offline' mode.
 
@@ -65,7 +80,8 @@ def run_migrations_offline():
     """
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
-        url=url, target_metadata=get_metadata(), literal_binds=True
+        url=url, target_metadata=get_metadata(), literal_binds=True,
+        include_object=include_object
     )
 
     with context.begin_transaction():
@@ -100,6 +116,7 @@ def run_migrations_online():
         context.configure(
             connection=connection,
             target_metadata=get_metadata(),
+            include_object=include_object,
             **conf_args
         )
 
@@ -0,0 +1,45 @@
+"""Add student rating aggregates
+
+Revision ID: 3f8a2c1d9b47
+Revises: ecfcff971af7
+Create Date: 2026-10-18 10:02:11.412093
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f8a2c1d9b47'
+down_revision = 'ecfcff971af7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('rating_sum', sa.Integer(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('rating_count', sa.Integer(), nullable=False, server_default='0'))
+
+    # Backfill from existing reviews
+    op.execute(
+        """
+        UPDATE "user" SET
+            rating_sum = COALESCE((
+                SELECT SUM(review.rating) FROM review
+                JOIN project ON project.id = review.project_id
+                WHERE project.student_id = "user".id
+            ), 0),
+            rating_count = (
+                SELECT COUNT(review.id) FROM review
+                JOIN project ON project.id = review.project_id
+                WHERE project.student_id = "user".id
+            )
+        """
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('rating_count')
+        batch_op.drop_column('rating_sum')
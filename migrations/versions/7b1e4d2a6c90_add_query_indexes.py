@@ -0,0 +1,44 @@
+"""Add composite indexes for listing and dashboard queries
+
+Revision ID: 7b1e4d2a6c90
+Revises: 3f8a2c1d9b47
+Create Date: 2026-10-18 11:24:05.118342
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b1e4d2a6c90'
+down_revision = '3f8a2c1d9b47'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ('ix_user_username', 'user', ['username']),
+    ('ix_user_role_status', 'user', ['role', 'status']),
+    ('ix_job_status_created_at', 'job', ['status', 'created_at', 'id']),
+    ('ix_job_client_id_created_at', 'job', ['client_id', 'created_at']),
+    ('ix_application_job_id_student_id', 'application', ['job_id', 'student_id']),
+    ('ix_application_job_id_created_at', 'application', ['job_id', 'created_at', 'id']),
+    ('ix_project_student_id_verified', 'project', ['student_id', 'verified']),
+    ('ix_project_client_id_created_at', 'project', ['client_id', 'created_at']),
+    ('ix_project_status_verified', 'project', ['status', 'verified']),
+    ('ix_message_sender_receiver_timestamp', 'message', ['sender_id', 'receiver_id', 'timestamp']),
+    ('ix_payment_payee_id_status_created_at', 'payment', ['payee_id', 'status', 'created_at']),
+    ('ix_review_project_id', 'review', ['project_id']),
+    ('ix_blog_status_created_at', 'blog', ['status', 'created_at', 'id']),
+    ('ix_blog_author_id_created_at', 'blog', ['author_id', 'created_at']),
+]
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
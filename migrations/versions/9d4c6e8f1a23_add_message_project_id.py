@@ -0,0 +1,50 @@
+"""Add project_id to message for per-project threads
+
+Revision ID: 9d4c6e8f1a23
+Revises: 7b1e4d2a6c90
+Create Date: 2026-10-18 12:03:47.530918
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d4c6e8f1a23'
+down_revision = '7b1e4d2a6c90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('message', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('project_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_message_project_id_project', 'project', ['project_id'], ['id'])
+        batch_op.create_index('ix_message_project_id_timestamp', ['project_id', 'timestamp', 'id'], unique=False)
+
+    # Attach existing messages to the project shared by sender and receiver,
+    # preferring the most recent project created before the message was sent.
+    pair = """
+        ((project.client_id = message.sender_id AND project.student_id = message.receiver_id)
+         OR (project.student_id = message.sender_id AND project.client_id = message.receiver_id))
+    """
+    op.execute(
+        f"""
+        UPDATE message SET project_id = COALESCE(
+            (SELECT project.id FROM project
+             WHERE {pair} AND project.created_at <= message.timestamp
+             ORDER BY project.created_at DESC LIMIT 1),
+            (SELECT project.id FROM project
+             WHERE {pair}
+             ORDER BY project.created_at ASC LIMIT 1)
+        )
+        WHERE project_id IS NULL
+        """
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('message', schema=None) as batch_op:
+        batch_op.drop_index('ix_message_project_id_timestamp')
+        batch_op.drop_constraint('fk_message_project_id_project', type_='foreignkey')
+        batch_op.drop_column('project_id')
@@ -0,0 +1,59 @@
+"""Add FTS5 full-text search tables and sync triggers
+
+Revision ID: b52e7f0c3d18
+Revises: 9d4c6e8f1a23
+Create Date: 2026-10-18 13:41:19.206755
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b52e7f0c3d18'
+down_revision = '9d4c6e8f1a23'
+branch_labels = None
+depends_on = None
+
+
+FTS_TABLES = {
+    'job_fts': ('job', ('title', 'description')),
+    'blog_fts': ('blog', ('title', 'content')),
+    'user_fts': ('user', ('username', 'skills', 'bio')),
+}
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for fts, (source, columns) in FTS_TABLES.items():
+        cols = ', '.join(columns)
+        new = ', '.join(f'new.{c}' for c in columns)
+        old = ', '.join(f'old.{c}' for c in columns)
+        op.execute(
+            f'CREATE VIRTUAL TABLE {fts} USING fts5({cols}, content="{source}", '
+            f'content_rowid="id", tokenize="unicode61 remove_diacritics 2")'
+        )
+        op.execute(
+            f'CREATE TRIGGER {fts}_ai AFTER INSERT ON "{source}" BEGIN '
+            f'INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END'
+        )
+        op.execute(
+            f'CREATE TRIGGER {fts}_ad AFTER DELETE ON "{source}" BEGIN '
+            f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); END"
+        )
+        op.execute(
+            f'CREATE TRIGGER {fts}_au AFTER UPDATE OF {cols} ON "{source}" BEGIN '
+            f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); "
+            f'INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END'
+        )
+        op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for fts in FTS_TABLES:
+        for suffix in ('ai', 'ad', 'au'):
+            op.execute(f'DROP TRIGGER IF EXISTS {fts}_{suffix}')
+        op.execute(f'DROP TABLE IF EXISTS {fts}')
@@ -0,0 +1,40 @@
+"""Add term_vector table for skill matching
+
+Populate it afterwards with ``flask rebuild-match-vectors``.
+
+Revision ID: c7a91e5b2f64
+Revises: b52e7f0c3d18
+Create Date: 2026-10-18 14:26:52.880417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7a91e5b2f64'
+down_revision = 'b52e7f0c3d18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('term_vector',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=10), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('term', sa.String(length=64), nullable=False),
+    sa.Column('weight', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('term_vector', schema=None) as batch_op:
+        batch_op.create_index('ix_term_vector_kind_term', ['kind', 'term', 'entity_id', 'weight'], unique=False)
+        batch_op.create_index('ix_term_vector_kind_entity_id', ['kind', 'entity_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('term_vector', schema=None) as batch_op:
+        batch_op.drop_index('ix_term_vector_kind_entity_id')
+        batch_op.drop_index('ix_term_vector_kind_term')
+
+    op.drop_table('term_vector')
@@ -0,0 +1,26 @@
+"""Add profile picture variants to user
+
+Revision ID: d3f0b8a1e657
+Revises: c7a91e5b2f64
+Create Date: 2026-10-18 15:38:09.671240
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3f0b8a1e657'
+down_revision = 'c7a91e5b2f64'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('profile_pic_variants', sa.Text(), nullable=True))
+
+
+def downgrade():
+    # Plain ALTER rather than batch mode: recreating "user" would drop its search triggers
+    op.drop_column('user', 'profile_pic_variants')
@@ -1,22 +1,136 @@
+from flask import current_app, g, has_request_context, session as flask_session
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session as FlaskSession
 from flask_login import UserMixin
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
 from datetime import datetime
+from contextlib import contextmanager
+from functools import partial, wraps
+import time
 
-db = SQLAlchemy()
+
+# 🔹 Read/write routing: read-only views SELECT from the "replica" bind
+PIN_KEY = "_pin_primary_until"
+
+
+def _replica_allowed():
+    if not has_request_context() or not g.get("replica_reads"):
+        return False
+    # Right after this browser wrote something, read it back from the primary
+    return flask_session.get(PIN_KEY, 0) < time.time()
+
+
+class RoutingSession(FlaskSession):
+    """Sends SELECTs from :func:`replica_reads` views to the replica; everything else to the primary."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        is_select = clause is not None and getattr(clause, "is_select", False)
+        if bind is None and is_select and not self._flushing and _replica_allowed():
+            replica = self._db.engines.get("replica")
+            if replica is not None:
+                return replica
+        if self._flushing or (clause is not None and getattr(clause, "is_dml", False)):
+            self.info["wrote_primary"] = True
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def replica_reads(view):
+    """Let ``view`` read from the replica unless the user has just written."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.replica_reads = True
+        return view(*args, **kwargs)
+    return wrapper
+
+
+@contextmanager
+def primary_reads():
+    """Read from the primary inside this block, even in a :func:`replica_reads` view.
+
+    For results that outlive the request (cached fragments, cached
+    counters): cache keys carry data versions that are bumped at commit,
+    so anything stored under them must not come from a lagging replica.
+    """
+    if not has_request_context():
+        yield
+        return
+    previous = g.get("replica_reads", False)
+    g.replica_reads = False
+    try:
+        yield
+    finally:
+        g.replica_reads = previous
+
+
+@event.listens_for(Session, "after_commit")
+def _pin_reads_to_primary(session):
+    wrote = session.info.pop("wrote_primary", False)
+    if wrote and has_request_context() and "replica" in db.engines:
+        flask_session[PIN_KEY] = time.time() + current_app.config.get("REPLICA_PIN_SECONDS", 10)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_primary_write(session):
+    session.info.pop("wrote_primary", None)
+
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
+
+
+# 🔹 Large text columns
+# Text bodies are deferred (group "body"; User.bio/skills are group "profile"),
+# so listing queries don't carry them. Job and Blog keep a stored excerpt for
+# listings, set whenever the body is assigned.
+EXCERPT_LENGTH = 200
+
+
+def excerpt(text):
+    return (text or "")[:EXCERPT_LENGTH]
+
+
+# 🔹 SQLite connection setup
+def _sqlite_pragmas(dbapi_connection, connection_record, config, readonly):
+    cursor = dbapi_connection.cursor()
+    if readonly:
+        cursor.execute("PRAGMA query_only = ON")
+    else:
+        # WAL lets readers run alongside the single writer instead of blocking it
+        cursor.execute("PRAGMA journal_mode = WAL")
+    cursor.execute("PRAGMA synchronous = NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout = {int(config.get('SQLITE_BUSY_TIMEOUT', 5000))}")
+    cursor.execute(f"PRAGMA mmap_size = {int(config.get('SQLITE_MMAP_SIZE', 0))}")
+    cursor.close()
+
+
+def configure_sqlite(app):
+    """Apply WAL, synchronous, busy timeout and mmap pragmas to every SQLite engine."""
+    with app.app_context():
+        for bind_key, engine in db.engines.items():
+            if engine.dialect.name != "sqlite":
+                continue
+            listener = partial(_sqlite_pragmas, config=app.config, readonly=bind_key == "replica")
+            event.listen(engine, "connect", listener)
 
 class User(db.Model, UserMixin):
+    __table_args__ = (
+        db.Index("ix_user_role_status", "role", "status"),
+        db.Index("ix_user_status", "status"),  # admin dashboard: pending users of any role
+    )
+
     id = db.Column(db.Integer, primary_key=True)
-    username = db.Column(db.String(80), unique=False,nullable=False)
+    username = db.Column(db.String(80), unique=False,nullable=False, index=True)
     password = db.Column(db.String(200), nullable=False)
     role = db.Column(db.String(20), nullable=False)
     status = db.Column(db.String(20), default="pending")
 
     # Existing fields
     badge = db.Column(db.String(100), default=None)
-    bio = db.Column(db.Text, default="")
-    skills = db.Column(db.Text, default="")
+    # Deferred: listings only need names and roles (undefer_group("profile") to load both)
+    bio = db.deferred(db.Column(db.Text, default=""), group="profile")
+    skills = db.deferred(db.Column(db.Text, default=""), group="profile")
     resume = db.Column(db.String(200), default=None)
     profile_pic = db.Column(db.String(200), default="static/default_avatar.png")
+    profile_pic_variants = db.Column(db.Text, nullable=True)  # JSON {width: path}, see images.py
 
     # 🔹 New proof fields
     email = db.Column(db.String(120), unique=True, nullable=True)
@@ -33,40 +147,158 @@ class User(db.Model, UserMixin):
     # File uploads (optional proofs)
     proof_file = db.Column(db.String(200), nullable=True)  # uploaded proof doc
 
+    # Rating aggregates, maintained by the Review events below
+    rating_sum = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    rating_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
     @property
     def average_rating(self):
-        from models import Review, Project
-        reviews = (
-            Review.query.join(Project)
-            .filter(Project.student_id == self.id)
-            .all()
-        )
-        if not reviews:
+        if not self.rating_count:
             return None
-        return sum(r.rating for r in reviews) / len(reviews)
+        return self.rating_sum / self.rating_count
+
+    @property
+    def review_count(self):
+        return self.rating_count or 0
 
 class Job(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     client_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
     title = db.Column(db.String(255), nullable=False)
-    description = db.Column(db.Text, nullable=False)
+    description = db.deferred(db.Column(db.Text, nullable=False), group="body")
+    excerpt = db.Column(db.String(EXCERPT_LENGTH))  # shown in listings instead of the description
     budget = db.Column(db.Float, nullable=False)
     status = db.Column(db.String(50), default="open")
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # Application counters, maintained by the Application events below
+    application_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    accepted_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    rejected_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
     client = db.relationship("User", foreign_keys=[client_id])
 
+    @property
+    def pending_count(self):
+        return self.application_count - self.accepted_count - self.rejected_count
+
+    @db.validates("description")
+    def _set_excerpt(self, key, description):
+        self.excerpt = excerpt(description)
+        return description
+
+    __table_args__ = (
+        db.Index("ix_job_status_created_at", "status", "created_at", "id"),
+        db.Index("ix_job_client_id_created_at", "client_id", "created_at"),
+    )
+
 class Application(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    job_id = db.Column(db.Integer, db.ForeignKey("job.id"), nullable=False)
+    # active_history so the job counter events below always see the previous value
+    job_id = db.column_property(
+        db.Column(db.Integer, db.ForeignKey("job.id"), nullable=False), active_history=True
+    )
     student_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
     cover_letter = db.Column(db.Text)
-    status = db.Column(db.String(50), default="pending")
+    status = db.column_property(db.Column(db.String(50), default="pending"), active_history=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     job = db.relationship("Job", backref="applications")
     student = db.relationship("User", foreign_keys=[student_id])
 
+    __table_args__ = (
+        db.Index("ix_application_job_id_student_id", "job_id", "student_id"),
+        db.Index("ix_application_job_id_created_at", "job_id", "created_at", "id"),
+    )
+
+
+def _counter_deltas(status, sign):
+    """``(total, accepted, rejected)`` deltas for adding (1) or removing (-1) one application."""
+    return sign, sign if status == "accepted" else 0, sign if status == "rejected" else 0
+
+
+def _adjust_job_counters(connection, job_id, deltas):
+    total, accepted, rejected = deltas
+    if job_id is None or not (total or accepted or rejected):
+        return
+    job = Job.__table__
+    connection.execute(
+        job.update()
+        .where(job.c.id == job_id)
+        .values(
+            application_count=job.c.application_count + total,
+            accepted_count=job.c.accepted_count + accepted,
+            rejected_count=job.c.rejected_count + rejected,
+        )
+    )
+
+
+@event.listens_for(Application, "after_insert")
+def _application_inserted(mapper, connection, target):
+    _adjust_job_counters(connection, target.job_id, _counter_deltas(target.status, 1))
+
+
+@event.listens_for(Application, "after_update")
+def _application_updated(mapper, connection, target):
+    state = inspect(target)
+    status = state.attrs.status.history
+    job = state.attrs.job_id.history
+    if not status.has_changes() and not job.has_changes():
+        return
+
+    old_status = status.deleted[0] if status.deleted else target.status
+    old_job = job.deleted[0] if job.deleted else target.job_id
+    removed = _counter_deltas(old_status, -1)
+    added = _counter_deltas(target.status, 1)
+
+    if old_job == target.job_id:
+        _adjust_job_counters(connection, target.job_id, [r + a for r, a in zip(removed, added)])
+    else:
+        _adjust_job_counters(connection, old_job, removed)
+        _adjust_job_counters(connection, target.job_id, added)
+
+
+@event.listens_for(Application, "after_delete")
+def _application_deleted(mapper, connection, target):
+    _adjust_job_counters(connection, target.job_id, _counter_deltas(target.status, -1))
+
+
+def recount_job_counters(*criteria):
+    """UPDATE statement recounting the application counters of jobs matching ``criteria``.
+
+    Only jobs whose stored counters differ are written, so ``rowcount``
+    is the number of jobs that had drifted. Bulk application updates,
+    which skip the events above, run it for the jobs they touched.
+    """
+    job = Job.__table__
+    application = Application.__table__
+
+    def counted(*where):
+        return (
+            db.select(db.func.count())
+            .where(application.c.job_id == job.c.id, *where)
+            .scalar_subquery()
+        )
+
+    total = counted()
+    accepted = counted(application.c.status == "accepted")
+    rejected = counted(application.c.status == "rejected")
+    return (
+        job.update()
+        .where(*criteria)
+        .where(db.or_(job.c.application_count != total,
+                      job.c.accepted_count != accepted,
+                      job.c.rejected_count != rejected))
+        .values(application_count=total, accepted_count=accepted, rejected_count=rejected)
+    )
+
+
+def reconcile_job_counters():
+    """Recompute every job's application counters; returns how many jobs had drifted."""
+    drifted = db.session.execute(recount_job_counters()).rowcount
+    db.session.commit()
+    return drifted
+
 import secrets
 
 class Project(db.Model):
@@ -85,38 +317,195 @@ class Project(db.Model):
     student = db.relationship("User", foreign_keys=[student_id])
     client = db.relationship("User", foreign_keys=[client_id])
 
+    __table_args__ = (
+        db.Index("ix_project_student_id_verified", "student_id", "verified"),
+        db.Index("ix_project_client_id_created_at", "client_id", "created_at"),
+        db.Index("ix_project_status_verified", "status", "verified"),
+        db.Index("ix_project_created_at", "created_at", "id"),  # admin analytics pages
+    )
+
 
 class Message(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     sender_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
     receiver_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
-    message_text = db.Column(db.Text, nullable=False)
+    project_id = db.Column(db.Integer, db.ForeignKey("project.id"), nullable=True)  # thread
+    message_text = db.deferred(db.Column(db.Text, nullable=False), group="body")
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
 
     sender = db.relationship("User", foreign_keys=[sender_id], backref="messages_sent")
     receiver = db.relationship("User", foreign_keys=[receiver_id], backref="messages_received")
 
+    __table_args__ = (
+        db.Index("ix_message_sender_receiver_timestamp", "sender_id", "receiver_id", "timestamp"),
+        db.Index("ix_message_project_id_timestamp", "project_id", "timestamp", "id"),
+    )
+
 
 class Payment(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     project_id = db.Column(db.Integer, db.ForeignKey("project.id"))
-    payer_id = db.Column(db.Integer, db.ForeignKey("user.id"))
-    payee_id = db.Column(db.Integer, db.ForeignKey("user.id"))
-    amount = db.Column(db.Float, nullable=False)
-    status = db.Column(db.String(50), default="pending")
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # active_history so the earnings ledger events (ledger.py) always see previous values
+    payer_id = db.column_property(db.Column(db.Integer, db.ForeignKey("user.id")), active_history=True)
+    payee_id = db.column_property(db.Column(db.Integer, db.ForeignKey("user.id")), active_history=True)
+    amount = db.column_property(db.Column(db.Float, nullable=False), active_history=True)
+    status = db.column_property(db.Column(db.String(50), default="pending"), active_history=True)
+    created_at = db.column_property(db.Column(db.DateTime, default=datetime.utcnow), active_history=True)
+
+    __table_args__ = (
+        db.Index("ix_payment_payee_id_status_created_at", "payee_id", "status", "created_at"),
+    )
 
 class Review(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    project_id = db.Column(db.Integer, db.ForeignKey("project.id"), nullable=False)
+    # active_history so the rating events below always see the previous value
+    project_id = db.column_property(
+        db.Column(db.Integer, db.ForeignKey("project.id"), nullable=False), active_history=True
+    )
     reviewer_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
-    rating = db.Column(db.Integer, nullable=False)  # 1–5 stars
+    rating = db.column_property(db.Column(db.Integer, nullable=False), active_history=True)  # 1–5 stars
     text = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     project = db.relationship("Project", backref="reviews")
     reviewer = db.relationship("User", foreign_keys=[reviewer_id])
 
+    __table_args__ = (
+        db.Index("ix_review_project_id", "project_id"),
+    )
+
+
+def _adjust_student_rating(connection, project_id, delta_sum, delta_count):
+    """Apply a rating delta to the student who owns ``project_id``."""
+    if project_id is None or (delta_sum == 0 and delta_count == 0):
+        return
+    user = User.__table__
+    student_id = (
+        db.select(Project.__table__.c.student_id)
+        .where(Project.__table__.c.id == project_id)
+        .scalar_subquery()
+    )
+    connection.execute(
+        user.update()
+        .where(user.c.id == student_id)
+        .values(
+            rating_sum=user.c.rating_sum + delta_sum,
+            rating_count=user.c.rating_count + delta_count,
+        )
+    )
+
+
+@event.listens_for(Review, "after_insert")
+def _review_inserted(mapper, connection, target):
+    _adjust_student_rating(connection, target.project_id, target.rating, 1)
+
+
+@event.listens_for(Review, "after_update")
+def _review_updated(mapper, connection, target):
+    state = inspect(target)
+    rating = state.attrs.rating.history
+    project = state.attrs.project_id.history
+    if not rating.has_changes() and not project.has_changes():
+        return
+
+    old_rating = rating.deleted[0] if rating.deleted else target.rating
+    old_project = project.deleted[0] if project.deleted else target.project_id
+
+    if old_project == target.project_id:
+        _adjust_student_rating(connection, target.project_id, target.rating - old_rating, 0)
+    else:
+        _adjust_student_rating(connection, old_project, -old_rating, -1)
+        _adjust_student_rating(connection, target.project_id, target.rating, 1)
+
+
+@event.listens_for(Review, "after_delete")
+def _review_deleted(mapper, connection, target):
+    _adjust_student_rating(connection, target.project_id, -target.rating, -1)
+
+
+def backfill_student_ratings():
+    """Recompute every student's rating aggregates from the Review table."""
+    user = User.__table__
+    totals = (
+        db.select(
+            Project.student_id,
+            db.func.coalesce(db.func.sum(Review.rating), 0),
+            db.func.count(Review.id),
+        )
+        .join(Project, Review.project_id == Project.id)
+        .group_by(Project.student_id)
+    )
+    db.session.execute(user.update().values(rating_sum=0, rating_count=0))
+    for student_id, rating_sum, rating_count in db.session.execute(totals):
+        if student_id is None:
+            continue
+        db.session.execute(
+            user.update()
+            .where(user.c.id == student_id)
+            .values(rating_sum=rating_sum, rating_count=rating_count)
+        )
+    db.session.commit()
+
+class TermVector(db.Model):
+    """One weighted term of a job's or student's skill vector (see matching.py)."""
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(10), nullable=False)   # job, student
+    entity_id = db.Column(db.Integer, nullable=False)
+    term = db.Column(db.String(64), nullable=False)
+    weight = db.Column(db.Float, nullable=False)      # rows per entity form a unit vector
+
+    __table_args__ = (
+        # Each term's postings strongest first: ranking reads only the head of each list
+        db.Index("ix_term_vector_kind_term_weight", "kind", "term", "weight", "entity_id"),
+        # Covering too, or SQLite reads a whole kind off the index above to fetch one vector
+        db.Index("ix_term_vector_kind_entity_id_term", "kind", "entity_id", "term", "weight"),
+    )
+
+class TermStat(db.Model):
+    """How many job or student vectors contain a term, for IDF weights (see matching.py).
+
+    The row with the empty term counts the vectors of that kind.
+    """
+    kind = db.Column(db.String(10), primary_key=True)
+    term = db.Column(db.String(64), primary_key=True)
+    df = db.Column(db.Integer, nullable=False, default=0)
+
+class EarningsMonth(db.Model):
+    """Completed payment totals per user and calendar month (see ledger.py)."""
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), primary_key=True)
+    kind = db.Column(db.String(10), primary_key=True)     # earned (payee), spent (payer)
+    month = db.Column(db.Integer, primary_key=True)       # year * 100 + month, e.g. 202610
+    total = db.Column(db.Float, nullable=False, default=0)
+    payment_count = db.Column(db.Integer, nullable=False, default=0)
+
+class Task(db.Model):
+    """A queued side effect, run by the worker in tasks.py."""
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(50), nullable=False)
+    payload = db.Column(db.Text, nullable=False, default="{}")   # JSON keyword arguments
+    idempotency_key = db.Column(db.String(200), unique=True, nullable=True)
+    status = db.Column(db.String(20), nullable=False, default="queued")  # queued, running, done, dead
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    run_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_at = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index("ix_task_status_run_at", "status", "run_at", "id"),
+    )
+
+class DeadTask(db.Model):
+    """Dead-letter record of a task that exhausted its retries."""
+    id = db.Column(db.Integer, primary_key=True)
+    task_id = db.Column(db.Integer, db.ForeignKey("task.id"), nullable=False, unique=True)
+    name = db.Column(db.String(50), nullable=False)
+    payload = db.Column(db.Text, nullable=False)
+    attempts = db.Column(db.Integer, nullable=False)
+    error = db.Column(db.Text, nullable=True)
+    failed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
 class RemovedUser(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), nullable=False)
@@ -129,8 +518,19 @@ class Blog(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     author_id = db.Column(db.Integer, db.ForeignKey("user.id"), nullable=False)
     title = db.Column(db.String(200), nullable=False)
-    content = db.Column(db.Text, nullable=False)
+    content = db.deferred(db.Column(db.Text, nullable=False), group="body")
+    excerpt = db.Column(db.String(EXCERPT_LENGTH))  # shown in listings instead of the content
     status = db.Column(db.String(20), default="pending")  # pending, approved, rejected
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     author = db.relationship("User", backref="blogs")
+
+    @db.validates("content")
+    def _set_excerpt(self, key, content):
+        self.excerpt = excerpt(content)
+        return content
+
+    __table_args__ = (
+        db.Index("ix_blog_status_created_at", "status", "created_at", "id"),
+        db.Index("ix_blog_author_id_created_at", "author_id", "created_at"),
+    )
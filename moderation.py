@@ -0,0 +1,110 @@
+"""Set-based admin moderation.
+
+Each function applies one status change to a list of ids with a single
+UPDATE (or INSERT ... SELECT plus DELETE for archiving) instead of
+loading and flushing every row. Bulk statements skip the ORM mapper
+events, so the cache namespaces they touch are queued on the session
+for the usual after-commit version bump, and callers invalidate the
+admin stats once the transaction commits.
+"""
+from datetime import datetime
+from matching import discard_vectors
+from models import db, User, Blog, Project, RemovedUser
+import principal
+
+USER_STATUSES = ("approved", "rejected")
+BLOG_STATUSES = ("approved", "rejected")
+
+
+def _touch(*namespaces):
+    db.session.info.setdefault("changed_namespaces", set()).update(namespaces)
+
+
+def _bulk_update(model, ids, values, *criteria):
+    if not ids:
+        return 0
+    result = db.session.execute(
+        db.update(model).where(model.id.in_(ids), *criteria).values(**values),
+        execution_options={"synchronize_session": False},
+    )
+    return result.rowcount
+
+
+def set_user_status(ids, status, exclude_id=None):
+    """Approve or reject users; ``exclude_id`` (the acting admin) is never touched."""
+    if status not in USER_STATUSES:
+        raise ValueError(status)
+    count = _bulk_update(User, ids, {"status": status}, User.id != exclude_id)
+    _touch("user")
+    principal.touch(*ids)
+    return count
+
+
+def _has_dependents():
+    """True for users that any other row still references (jobs, projects, messages...)."""
+    user = User.__table__
+    references = [
+        db.exists().where(fk.parent == user.c.id)
+        for table in db.metadata.sorted_tables
+        for fk in table.foreign_keys
+        if fk.column is user.c.id
+    ]
+    return db.or_(*references)
+
+
+def remove_users(ids, reason="Removed by admin", exclude_id=None):
+    """Archive users into RemovedUser and delete them.
+
+    Users that other rows still reference are left in place, as the
+    single-user removal refuses them too; returns ``(removed, skipped_ids)``.
+    """
+    if not ids:
+        return 0, []
+    selected = [User.id.in_(ids), User.id != exclude_id]
+    has_dependents = _has_dependents()
+    skipped = list(db.session.execute(
+        db.select(User.id).where(*selected, has_dependents).order_by(User.id)
+    ).scalars())
+    selected.append(~has_dependents)
+    db.session.execute(
+        db.insert(RemovedUser).from_select(
+            ["username", "email", "role", "reason", "removed_at"],
+            db.select(
+                User.username,
+                db.func.coalesce(User.email, ""),
+                User.role,
+                db.literal(reason),
+                db.literal(datetime.utcnow()),
+            ).where(*selected),
+        )
+    )
+    # The per-row delete event clears skill vectors; a bulk delete must do it itself
+    discard_vectors(db.session.connection(), "student", db.select(User.id).where(*selected))
+    count = db.session.execute(
+        db.delete(User).where(*selected),
+        execution_options={"synchronize_session": False},
+    ).rowcount
+    _touch("user")
+    principal.touch(*ids)
+    return count, skipped
+
+
+def set_blog_status(ids, status):
+    if status not in BLOG_STATUSES:
+        raise ValueError(status)
+    count = _bulk_update(Blog, ids, {"status": status})
+    _touch("blog")
+    return count
+
+
+def verify_projects(ids):
+    """Mark submitted projects with an approval code as verified and completed.
+
+    The criteria match the admin_verify listing; other ids are ignored.
+    """
+    count = _bulk_update(
+        Project, ids, {"verified": True, "status": "completed"},
+        Project.approval_code.isnot(None), Project.verified.is_(False), Project.status == "submitted",
+    )
+    _touch("project")
+    return count
@@ -0,0 +1,89 @@
+"""Keyset (cursor) pagination on ``(created_at, id)``.
+
+Pages are fetched with ``WHERE (created_at, id) < cursor ORDER BY created_at
+DESC, id DESC LIMIT n`` so every page costs the same however deep it is.
+Tables without a timestamp page on ``(id, id)``. Cursors are opaque
+url-safe strings encoding the last row's key.
+"""
+import base64
+from datetime import datetime
+from flask import abort, current_app, request
+from sqlalchemy import and_, or_
+
+
+class Page:
+    def __init__(self, items, next_cursor):
+        self.items = items
+        self.next_cursor = next_cursor
+
+    @property
+    def has_more(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def encode_cursor(sort_value, row_id):
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    raw = f"{sort_value}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, sort_type=datetime):
+    """Return ``(sort value, id)`` for a cursor string, aborting 400 if it is malformed."""
+    parse = datetime.fromisoformat if sort_type is datetime else sort_type
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return parse(sort_value), int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        abort(400, description="Invalid cursor")
+
+
+def keyset_paginate(query, sort_column, id_column, cursor=None, per_page=None):
+    """Return a newest-first :class:`Page` of ``query`` after ``cursor``."""
+    if per_page is None:
+        per_page = current_app.config.get("PAGE_SIZE", 20)
+
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor, sort_column.type.python_type)
+        query = query.filter(
+            or_(
+                sort_column < sort_value,
+                and_(sort_column == sort_value, id_column < row_id),
+            )
+        )
+
+    rows = (
+        query.order_by(None)
+        .order_by(sort_column.desc(), id_column.desc())
+        .limit(per_page + 1)
+        .all()
+    )
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, sort_column.key), last.id)
+    return Page(rows, next_cursor)
+
+
+def paginate_request(query, sort_column, id_column, arg="cursor"):
+    """:func:`keyset_paginate` using the ``cursor`` (or ``arg``) query-string argument."""
+    return keyset_paginate(query, sort_column, id_column, cursor=request.args.get(arg))
+
+
+def wants_json():
+    return request.args.get("format") == "json"
+
+
+def page_json(page, serialize):
+    return {
+        "items": [serialize(item) for item in page.items],
+        "next_cursor": page.next_cursor,
+    }
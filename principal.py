@@ -0,0 +1,143 @@
+"""Cached Flask-Login user loading.
+
+Most requests only need to know who the user is and what they may do, so
+the user loader returns a :class:`Principal` (id, role, status, username)
+instead of a full ``User`` row with its Text columns. Principals are kept
+in a per-process LRU with a TTL, stamped with the user's data version;
+committing a change to that user (profile edit, approval, rejection,
+removal) bumps the version, so the next request reloads it. The stamps
+live in a store of their own, sized like the principal LRU, so logins
+never evict the fragment cache's entries. With the filesystem cache
+backend that store is a directory under ``CACHE_DIR``, so one worker's
+edit invalidates every worker's copy.
+
+Anything beyond the four cached fields (``current_user.bio``) loads the
+full ``User`` on first use; routes that modify the user should take
+``current_user.user`` explicitly.
+"""
+import os
+import time
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from cache import FileBackend, MemoryBackend, NullBackend
+from models import db, User, primary_reads
+
+_principals = MemoryBackend()
+_versions = MemoryBackend()
+_ttl = 60
+
+
+class Principal:
+    __slots__ = ("id", "role", "status", "username")
+
+    is_authenticated = True
+    is_active = True
+    is_anonymous = False
+
+    def __init__(self, id, role, status, username):
+        self.id = id
+        self.role = role
+        self.status = status
+        self.username = username
+
+    def get_id(self):
+        return str(self.id)
+
+    @property
+    def user(self):
+        """The full ``User`` row (the session's identity map keeps it for the request)."""
+        return db.session.get(User, self.id)
+
+    def __getattr__(self, name):
+        # Only reached for attributes that are not slots: bio, skills, relationships...
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(self.user, name)
+
+    def __eq__(self, other):
+        return isinstance(other, (Principal, User)) and self.id == other.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __repr__(self):
+        return f"<Principal {self.id} {self.role}>"
+
+
+# 🔹 User data versions
+def _version(user_id):
+    key = f"user:{user_id}"
+    value = _versions.get(key)
+    if value is None:
+        # A fresh, never-before-seen value: an evicted version can't revive old entries
+        value = time.time_ns()
+        _versions.set(key, value)
+    return value
+
+
+def _bump(user_id):
+    _versions.set(f"user:{user_id}", time.time_ns())
+
+
+def touch(*user_ids):
+    """Queue a version bump for users changed by bulk statements (no ORM events)."""
+    db.session.info.setdefault("changed_users", set()).update(user_ids)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session, flush_context):
+    changed = session.info.setdefault("changed_users", set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User):
+            changed.add(obj.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_changed_users(session):
+    for user_id in session.info.pop("changed_users", ()):
+        _bump(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_users(session):
+    session.info.pop("changed_users", None)
+
+
+# 🔹 Loading
+def load_principal(user_id):
+    """The cached principal for ``user_id``, or None if the user no longer exists."""
+    version = _version(user_id)
+    cached = _principals.get(user_id)
+    if cached is not None and cached[0] == version:
+        return Principal(*cached[1])
+
+    # The version is read before the row, so a concurrent bump can only make us reload
+    # again; the row comes from the primary, since it is cached under that version
+    with primary_reads():
+        row = db.session.execute(
+            db.select(User.id, User.role, User.status, User.username).where(User.id == user_id)
+        ).first()
+    if row is None:
+        return None
+    _principals.set(user_id, (version, tuple(row)), _ttl)
+    return Principal(*row)
+
+
+def clear():
+    """Forget every cached principal (benchmarks measure the cold path with it)."""
+    _principals.clear()
+
+
+def init_app(app):
+    global _principals, _versions, _ttl
+    size = app.config.get("USER_CACHE_SIZE", 4096)
+    _principals = MemoryBackend(size)
+    kind = app.config.get("CACHE_BACKEND", "memory")
+    if kind == "filesystem":
+        directory = app.config.get("CACHE_DIR", os.path.join(app.instance_path, "cache"))
+        _versions = FileBackend(os.path.join(directory, "users"), size)
+    elif kind == "null":
+        _versions = NullBackend()
+    else:
+        _versions = MemoryBackend(size)
+    _ttl = app.config.get("USER_CACHE_TTL", 60)
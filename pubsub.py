@@ -0,0 +1,43 @@
+"""Tiny in-process publish/subscribe broker.
+
+Subscribers get a :class:`queue.Queue` per channel; publishers push small
+payloads (ids, not ORM objects) to every queue on that channel. This only
+reaches subscribers in the same process, so a multi-process deployment
+still relies on the ``since_id`` catch-up query that readers run anyway.
+"""
+import queue
+import threading
+
+
+class Broker:
+    def __init__(self, maxsize=100):
+        self._maxsize = maxsize
+        self._channels = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel):
+        q = queue.Queue(maxsize=self._maxsize)
+        with self._lock:
+            self._channels.setdefault(channel, set()).add(q)
+        return q
+
+    def unsubscribe(self, channel, q):
+        with self._lock:
+            subscribers = self._channels.get(channel)
+            if subscribers is not None:
+                subscribers.discard(q)
+                if not subscribers:
+                    del self._channels[channel]
+
+    def publish(self, channel, payload):
+        with self._lock:
+            subscribers = list(self._channels.get(channel, ()))
+        for q in subscribers:
+            try:
+                q.put_nowait(payload)
+            except queue.Full:
+                # Slow reader; it will catch up from the database on its next wake-up
+                pass
+
+
+broker = Broker()
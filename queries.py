@@ -0,0 +1,189 @@
+"""Shared query builders for dashboards and listings.
+
+Each builder declares the relationships its template walks, so a page
+renders with a fixed number of SELECTs no matter how many rows it shows.
+"""
+import time
+from flask import current_app
+from sqlalchemy import case, event, func, select, true
+from sqlalchemy.orm import Session, joinedload, selectinload, undefer
+from models import db, User, Job, Application, Project, Message, Review, Blog, primary_reads
+
+
+# 🔹 Jobs
+def open_jobs_query():
+    """Open jobs, newest first, with the posting client (jobs.html, index.html)."""
+    return (
+        Job.query.filter_by(status="open")
+        .options(joinedload(Job.client))
+        .order_by(Job.created_at.desc())
+    )
+
+
+def client_jobs_query(client_id):
+    """Jobs posted by one client (client_dashboard.html)."""
+    return Job.query.filter_by(client_id=client_id).order_by(Job.created_at.desc())
+
+
+# 🔹 Applications
+def job_applications_query(job_id):
+    """Applications to one job with the applying student (job_detail.html)."""
+    return Application.query.filter_by(job_id=job_id).options(joinedload(Application.student))
+
+
+# 🔹 Projects
+def client_projects_query(client_id):
+    """A client's projects with job and student (client_dashboard.html)."""
+    return (
+        Project.query.filter_by(client_id=client_id)
+        .options(joinedload(Project.job), joinedload(Project.student))
+        .order_by(Project.created_at.desc())
+    )
+
+
+def student_projects_query(student_id):
+    """A student's projects with job and the job's client (jobs.html)."""
+    return (
+        Project.query.filter_by(student_id=student_id)
+        .options(joinedload(Project.job).joinedload(Job.client))
+        .order_by(Project.created_at.desc())
+    )
+
+
+def all_projects_query():
+    """Projects with job, student and client (admin_analytics.html, paged)."""
+    return (
+        Project.query
+        .options(
+            joinedload(Project.job),
+            joinedload(Project.student),
+            joinedload(Project.client),
+        )
+        .order_by(Project.created_at.desc())
+    )
+
+
+def verified_projects_query(student_id):
+    """Verified projects with reviews and reviewers (portfolio.html)."""
+    return (
+        Project.query.filter_by(student_id=student_id, verified=True)
+        .options(
+            joinedload(Project.job),
+            selectinload(Project.reviews).joinedload(Review.reviewer),
+        )
+    )
+
+
+# 🔹 Messages
+def project_messages_query(project):
+    """One project's message thread with senders (messages.html)."""
+    return (
+        Message.query.filter_by(project_id=project.id)
+        .options(undefer(Message.message_text), joinedload(Message.sender))
+    )
+
+
+def project_messages_since_query(project_id, since_id):
+    """Messages in a thread newer than ``since_id``, oldest first (live chat deltas)."""
+    return (
+        Message.query.filter(Message.project_id == project_id, Message.id > since_id)
+        .options(undefer(Message.message_text), joinedload(Message.sender))
+        .order_by(Message.id.asc())
+    )
+
+
+# 🔹 Users
+def all_users_query():
+    """Users for the admin tables (paged); no relationships are rendered."""
+    return User.query.order_by(User.id)
+
+
+# 🔹 Blogs
+def blogs_by_status_query(status):
+    """Blogs in one moderation state with their author (blogs.html, admin_blogs.html)."""
+    return (
+        Blog.query.filter_by(status=status)
+        .options(joinedload(Blog.author))
+        .order_by(Blog.created_at.desc())
+    )
+
+
+# 🔹 Admin analytics counters
+_stats_cache = {"value": None, "expires": 0.0, "generation": 0}
+
+
+def _count_if(condition):
+    return func.count(case((condition, 1)))
+
+
+def _compute_admin_stats():
+    users = select(
+        func.count(User.id).label("total_users"),
+        _count_if(User.role == "Student").label("total_students"),
+        _count_if(User.role == "Client").label("total_clients"),
+        _count_if((User.role == "Student") & (User.status == "pending")).label("pending_students"),
+        func.avg(
+            case(
+                ((User.role == "Student") & (User.rating_count > 0),
+                 User.rating_sum * 1.0 / User.rating_count)
+            )
+        ).label("avg_student_rating"),
+    ).subquery()
+    jobs = select(
+        func.count(Job.id).label("total_jobs"),
+        _count_if(Job.status == "open").label("open_jobs"),
+        _count_if(Job.status == "closed").label("closed_jobs"),
+    ).subquery()
+    projects = select(
+        func.count(Project.id).label("total_projects"),
+        _count_if(Project.status == "completed").label("completed_projects"),
+        _count_if(Project.verified == True).label("verified_projects"),
+    ).subquery()
+
+    row = db.session.execute(
+        select(users, jobs, projects)
+        .select_from(users)
+        .join(jobs, true())
+        .join(projects, true())
+    ).one()
+    return dict(row._mapping)
+
+
+def admin_stats():
+    """Dashboard counters from one aggregate query, cached for ADMIN_STATS_TTL seconds."""
+    now = time.monotonic()
+    if _stats_cache["value"] is not None and now < _stats_cache["expires"]:
+        return dict(_stats_cache["value"])
+    generation = _stats_cache["generation"]
+    with primary_reads():  # cached past the replica's lag
+        value = _compute_admin_stats()
+    # A commit invalidated the cache while we counted: serve this result, don't keep it
+    if generation == _stats_cache["generation"]:
+        _stats_cache["value"] = value
+        _stats_cache["expires"] = now + current_app.config.get("ADMIN_STATS_TTL", 30)
+    return dict(value)
+
+
+def invalidate_admin_stats(*args):
+    _stats_cache["generation"] += 1
+    _stats_cache["value"] = None
+
+
+# Invalidate once the change is committed; during the flush a concurrent
+# request would recount the old rows and cache them for the whole TTL
+@event.listens_for(Session, "after_flush")
+def _collect_admin_stats_changes(session, flush_context):
+    changed = list(session.new) + list(session.dirty) + list(session.deleted)
+    if any(isinstance(obj, (User, Job, Project)) for obj in changed):
+        session.info["admin_stats_changed"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_admin_stats(session):
+    if session.info.pop("admin_stats_changed", False):
+        invalidate_admin_stats()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_admin_stats_changes(session):
+    session.info.pop("admin_stats_changed", None)
@@ -0,0 +1,57 @@
+"""Replication stand-in for local development.
+
+With both the primary and ``DATABASE_REPLICA_URL`` pointing at SQLite
+files, :func:`sync_replica` copies the primary into the replica with
+SQLite's online backup API. Run it once, or keep the replica a few
+seconds behind with ``flask sync-replica --interval 2``. Real
+deployments use the database server's own replication instead.
+"""
+import logging
+import sqlite3
+import threading
+import time
+from models import db
+
+log = logging.getLogger(__name__)
+
+
+def _sqlite_paths(app):
+    with app.app_context():
+        primary = db.engines[None]
+        replica = db.engines.get("replica")
+    if replica is None:
+        raise RuntimeError("No replica bind configured (set DATABASE_REPLICA_URL)")
+    if primary.dialect.name != "sqlite" or replica.dialect.name != "sqlite":
+        raise RuntimeError("The replication stand-in only copies SQLite files")
+    return primary.url.database, replica.url.database
+
+
+def sync_replica(app):
+    """Copy the primary database into the replica file in one consistent snapshot."""
+    source_path, target_path = _sqlite_paths(app)
+    busy_timeout = app.config.get("SQLITE_BUSY_TIMEOUT", 5000) / 1000
+    source = sqlite3.connect(source_path, timeout=busy_timeout)
+    target = sqlite3.connect(target_path, timeout=busy_timeout)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+
+
+def run_replication(app, interval=None):
+    """Sync the replica every ``interval`` seconds until interrupted."""
+    interval = interval or app.config.get("REPLICA_SYNC_INTERVAL", 2)
+    while True:
+        try:
+            sync_replica(app)
+        except sqlite3.Error:
+            log.exception("Replica sync failed")
+        time.sleep(interval)
+
+
+def start_replication_thread(app):
+    """Keep a local SQLite replica in sync from a daemon thread (development)."""
+    thread = threading.Thread(target=run_replication, args=(app,), name="replica-sync", daemon=True)
+    thread.start()
+    return thread
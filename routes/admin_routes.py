@@ -1,6 +1,11 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, abort
+from flask import Blueprint, render_template, request, redirect, url_for, flash, abort, jsonify
 from flask_login import login_required, current_user
-from models import db, User, Project, Job
+from sqlalchemy.orm import undefer_group
+from models import db, User, Project, replica_reads
+from queries import admin_stats, all_projects_query, all_users_query, blogs_by_status_query, invalidate_admin_stats
+from cache import page_cache
+from pagination import paginate_request, wants_json
+import moderation
 
 admin_bp = Blueprint("admin", __name__, url_prefix="/admin")
 
@@ -10,10 +15,48 @@ def admin_dashboard():
     if current_user.role != "Admin":
         abort(403)
     pending_users = User.query.filter_by(status="pending").all()
-    projects = Project.query.all()
-    jobs = Job.query.all()
-    return render_template("admin_dashboard.html",
-                           pending_users=pending_users, projects=projects, jobs=jobs)
+    return render_template("admin_dashboard.html", pending_users=pending_users)
+
+
+# 🔹 Bulk moderation: one set-based statement per action
+def _selected_ids(field):
+    try:
+        return sorted({int(v) for v in request.form.getlist(field)})
+    except ValueError:
+        abort(400)
+
+def _bulk_done(count, message, category, endpoint, skipped=None):
+    db.session.commit()
+    invalidate_admin_stats()
+    if wants_json():
+        body = {"updated": count}
+        if skipped is not None:
+            body["skipped"] = skipped
+        return jsonify(body)
+    flash(message.format(count=count), category)
+    if skipped:
+        flash(f"{len(skipped)} users kept because jobs, projects, messages or payments still "
+              f"reference them (ids {', '.join(map(str, skipped))}).", "warning")
+    return redirect(url_for(endpoint))
+
+@admin_bp.route("/users/bulk", methods=["POST"])
+@login_required
+def bulk_users():
+    if current_user.role != "Admin":
+        abort(403)
+    ids = _selected_ids("user_ids")
+    action = request.form.get("action")
+    if action == "approve":
+        count = moderation.set_user_status(ids, "approved", exclude_id=current_user.id)
+        return _bulk_done(count, "{count} users approved!", "success", "admin.admin_dashboard")
+    if action == "reject":
+        count = moderation.set_user_status(ids, "rejected", exclude_id=current_user.id)
+        return _bulk_done(count, "{count} users rejected!", "danger", "admin.admin_dashboard")
+    if action == "remove":
+        count, skipped = moderation.remove_users(ids, exclude_id=current_user.id)
+        return _bulk_done(count, "{count} users removed and archived.", "danger",
+                          "admin.admin_dashboard", skipped=skipped)
+    abort(400)
 
 @admin_bp.route("/user/<int:user_id>/approve", methods=["POST"])
 @login_required
@@ -46,64 +89,52 @@ def admin_verify():
     projects = Project.query.filter(Project.approval_code != None,Project.verified == False,Project.status == "submitted").all()
     if request.method == "POST":
         pid = int(request.form["project_id"])
-        project = Project.query.get_or_404(pid)
-        project.verified = True
-        project.status = "completed"
-        db.session.commit()
-        flash("Project verified!", "success")
+        if moderation.verify_projects([pid]):
+            db.session.commit()
+            invalidate_admin_stats()
+            flash("Project verified!", "success")
+        else:
+            flash("Only submitted projects with an approval code can be verified.", "warning")
         return redirect(url_for("admin.admin_verify"))
     return render_template("admin_verify.html", projects=projects)
 
+@admin_bp.route("/verify/bulk", methods=["POST"])
+@login_required
+def bulk_verify():
+    if current_user.role != "Admin":
+        abort(403)
+    count = moderation.verify_projects(_selected_ids("project_ids"))
+    return _bulk_done(count, "{count} projects verified!", "success", "admin.admin_verify")
+
 @admin_bp.route("/analytics")
 @login_required
+@replica_reads
 def admin_analytics():
     if current_user.role != "Admin":
         abort(403)
 
-    total_users = User.query.count()
-    total_students = User.query.filter_by(role="Student").count()
-    total_clients = User.query.filter_by(role="Client").count()
-    pending_students = User.query.filter_by(role="Student", status="pending").count()
-
-    total_jobs = Job.query.count()
-    open_jobs = Job.query.filter_by(status="open").count()
-    closed_jobs = Job.query.filter_by(status="closed").count()
-
-    total_projects = Project.query.count()
-    completed_projects = Project.query.filter_by(status="completed").count()
-    verified_projects = Project.query.filter_by(verified=True).count()
-
-    avg_rating = None
-    ratings = [u.average_rating for u in User.query.filter_by(role="Student").all() if u.average_rating]
-    if ratings:
-        avg_rating = sum(ratings) / len(ratings)
-
-    stats = {
-        "total_users": total_users,
-        "total_students": total_students,
-        "total_clients": total_clients,
-        "pending_students": pending_students,
-        "total_jobs": total_jobs,
-        "open_jobs": open_jobs,
-        "closed_jobs": closed_jobs,
-        "total_projects": total_projects,
-        "completed_projects": completed_projects,
-        "verified_projects": verified_projects,
-        "avg_student_rating": avg_rating,
-    }
-
-    projects = Project.query.all()
-    users = User.query.all()   # ✅ Fetch all users
+    stats = admin_stats()
+
+    # ✅ One keyset page of each table; the totals come from the stats
+    projects = paginate_request(all_projects_query(), Project.created_at, Project.id, arg="projects_cursor")
+    users = paginate_request(all_users_query(), User.id, User.id, arg="users_cursor")
 
     return render_template("admin_analytics.html", stats=stats, projects=projects, users=users)
 
+@admin_bp.route("/cache_stats")
+@login_required
+def cache_stats():
+    if current_user.role != "Admin":
+        abort(403)
+    return jsonify(page_cache.stats())
+
 @admin_bp.route("/user/<int:user_id>")
 @login_required
 def view_user(user_id):
     if current_user.role != "Admin":
         abort(403)
 
-    user = User.query.get_or_404(user_id)
+    user = User.query.options(undefer_group("profile")).get_or_404(user_id)
 
     # Show profile even if not yet approved
     projects = Project.query.filter_by(student_id=user.id, verified=True).all() if user.role == "Student" else []
@@ -151,9 +182,9 @@ from models import Blog
 def manage_blogs():
     if current_user.role != "Admin":
         abort(403)
-    pending_blogs = Blog.query.filter_by(status="pending").all()
-    approved_blogs = Blog.query.filter_by(status="approved").all()
-    rejected_blogs = Blog.query.filter_by(status="rejected").all()
+    pending_blogs = blogs_by_status_query("pending").all()
+    approved_blogs = blogs_by_status_query("approved").all()
+    rejected_blogs = blogs_by_status_query("rejected").all()
     return render_template("admin_blogs.html", pending=pending_blogs, approved=approved_blogs, rejected=rejected_blogs)
 
 @admin_bp.route("/blogs/<int:blog_id>/approve", methods=["POST"])
@@ -177,3 +208,19 @@ def reject_blog(blog_id):
     db.session.commit()
     flash("Blog rejected!", "danger")
     return redirect(url_for("admin.manage_blogs"))
+
+@admin_bp.route("/blogs/bulk", methods=["POST"])
+@login_required
+def bulk_blogs():
+    if current_user.role != "Admin":
+        abort(403)
+    ids = _selected_ids("blog_ids")
+    action = request.form.get("action")
+    if action == "approve":
+        count = moderation.set_blog_status(ids, "approved")
+        return _bulk_done(count, "{count} blogs approved!", "success", "admin.manage_blogs")
+    if action == "reject":
+        count = moderation.set_blog_status(ids, "rejected")
+        return _bulk_done(count, "{count} blogs rejected!", "danger", "admin.manage_blogs")
+    abort(400)
+
@@ -0,0 +1,314 @@
+"""Versioned JSON API (``/api/v1``).
+
+Every resource is read with a column-only query built from the fields the
+client asked for (``?fields=id,title``), so no ORM objects are loaded.
+Listings use the same keyset cursors as the HTML pages (``?cursor=``).
+Responses carry a strong ETag computed from the selected column values;
+a request whose ``If-None-Match`` still matches gets ``304 Not Modified``
+with an empty body.
+"""
+from datetime import datetime
+from flask import Blueprint, abort, g, jsonify, request
+from flask_login import current_user
+from sqlalchemy import case
+from sqlalchemy.orm import aliased
+from werkzeug.exceptions import HTTPException
+from models import db, User, Job, Application, Project, Message, Review, Blog
+from pagination import keyset_paginate
+
+api_bp = Blueprint("api", __name__, url_prefix="/api/v1")
+
+_client = aliased(User)
+_student = aliased(User)
+_author = aliased(User)
+_sender = aliased(User)
+
+
+class Resource:
+    """Field name -> column map for one model, plus the joins some fields need."""
+
+    def __init__(self, model, fields, joins=None, defaults=None):
+        self.model = model
+        self.fields = fields
+        self.joins = joins or {}          # field -> (target, onclause)
+        self.defaults = defaults or list(fields)
+
+    def requested_fields(self):
+        raw = request.args.get("fields")
+        if not raw:
+            return self.defaults
+        names = [name.strip() for name in raw.split(",") if name.strip()]
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            abort(400, description=f"Unknown fields: {', '.join(unknown)}")
+        return names
+
+    def query(self, names, sort_key=None):
+        """Column-only query for ``names``; ``id`` and ``sort_key`` are always selected."""
+        selected = list(dict.fromkeys(["id", *([sort_key] if sort_key else []), *names]))
+        query = db.session.query(*(self.fields[name].label(name) for name in selected))
+        query = query.select_from(self.model)
+        joined = []
+        for name in selected:
+            join = self.joins.get(name)
+            if join and join not in joined:
+                query = query.outerjoin(*join)
+                joined.append(join)
+        return query
+
+
+JOBS = Resource(Job, {
+    "id": Job.id,
+    "title": Job.title,
+    "description": Job.description,
+    "excerpt": Job.excerpt,
+    "budget": Job.budget,
+    "status": Job.status,
+    "application_count": Job.application_count,
+    "accepted_count": Job.accepted_count,
+    "rejected_count": Job.rejected_count,
+    "client_id": Job.client_id,
+    "client": _client.username,
+    "created_at": Job.created_at,
+}, joins={"client": (_client, _client.id == Job.client_id)})
+
+APPLICATIONS = Resource(Application, {
+    "id": Application.id,
+    "job_id": Application.job_id,
+    "student_id": Application.student_id,
+    "student": _student.username,
+    "cover_letter": Application.cover_letter,
+    "status": Application.status,
+    "created_at": Application.created_at,
+}, joins={"student": (_student, _student.id == Application.student_id)})
+
+PROJECTS = Resource(Project, {
+    "id": Project.id,
+    "job_id": Project.job_id,
+    "job_title": Job.title,
+    "student_id": Project.student_id,
+    "student": _student.username,
+    "client_id": Project.client_id,
+    "client": _client.username,
+    "status": Project.status,
+    "progress": Project.progress,
+    "final_file": Project.final_file,
+    "verified": Project.verified,
+    "created_at": Project.created_at,
+}, joins={
+    "job_title": (Job, Job.id == Project.job_id),
+    "student": (_student, _student.id == Project.student_id),
+    "client": (_client, _client.id == Project.client_id),
+})
+
+MESSAGES = Resource(Message, {
+    "id": Message.id,
+    "project_id": Message.project_id,
+    "sender_id": Message.sender_id,
+    "receiver_id": Message.receiver_id,
+    "sender": _sender.username,
+    "message_text": Message.message_text,
+    "timestamp": Message.timestamp,
+}, joins={"sender": (_sender, _sender.id == Message.sender_id)})
+
+BLOGS = Resource(Blog, {
+    "id": Blog.id,
+    "title": Blog.title,
+    "content": Blog.content,
+    "excerpt": Blog.excerpt,
+    "status": Blog.status,
+    "author_id": Blog.author_id,
+    "author": _author.username,
+    "created_at": Blog.created_at,
+}, joins={"author": (_author, _author.id == Blog.author_id)})
+
+STUDENTS = Resource(User, {
+    "id": User.id,
+    "username": User.username,
+    "bio": User.bio,
+    "skills": User.skills,
+    "badge": User.badge,
+    "profile_pic": User.profile_pic,
+    "average_rating": case(
+        (User.rating_count > 0, User.rating_sum * 1.0 / User.rating_count), else_=None
+    ),
+    "review_count": User.rating_count,
+})
+
+
+# 🔹 Response helpers
+def _jsonable(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _row_json(row, names):
+    mapping = row._mapping
+    return {name: _jsonable(mapping[name]) for name in names}
+
+
+def _conditional(body):
+    """JSON response with a strong content ETag; 304 if the client already has it."""
+    response = jsonify(body)
+    response.headers["Cache-Control"] = "private, no-cache"
+    response.add_etag()
+    return response.make_conditional(request)
+
+
+def _page(resource, query, sort_key, names):
+    sort_column = resource.fields[sort_key]
+    page = keyset_paginate(query, sort_column, resource.fields["id"],
+                           cursor=request.args.get("cursor"), per_page=_per_page())
+    return _conditional({
+        "items": [_row_json(row, names) for row in page.items],
+        "next_cursor": page.next_cursor,
+    })
+
+
+def _one(query, names):
+    row = query.first()
+    if row is None:
+        abort(404)
+    return _conditional(_row_json(row, names))
+
+
+def _per_page():
+    limit = request.args.get("limit", type=int)
+    return max(1, min(limit, 100)) if limit else None
+
+
+def _require_user():
+    if not current_user.is_authenticated:
+        abort(401)
+    return current_user
+
+
+def _project_participant(project_id):
+    user = _require_user()
+    project = db.session.execute(
+        db.select(Project.client_id, Project.student_id).where(Project.id == project_id)
+    ).first()
+    if project is None:
+        abort(404)
+    if user.role != "Admin" and user.id not in (project.client_id, project.student_id):
+        abort(403)
+
+
+@api_bp.before_request
+def _read_from_replica():
+    # Every endpoint here is a read; see models.replica_reads
+    g.replica_reads = request.method == "GET"
+
+
+@api_bp.errorhandler(HTTPException)
+def _api_error(error):
+    return jsonify({"error": error.name, "description": error.description}), error.code
+
+
+# 🔹 Jobs
+@api_bp.route("/jobs")
+def jobs():
+    names = JOBS.requested_fields()
+    query = JOBS.query(names, "created_at").filter(Job.status == "open")
+    return _page(JOBS, query, "created_at", names)
+
+
+@api_bp.route("/jobs/<int:job_id>")
+def job(job_id):
+    names = JOBS.requested_fields()
+    return _one(JOBS.query(names).filter(Job.id == job_id), names)
+
+
+@api_bp.route("/jobs/<int:job_id>/applications")
+def job_applications(job_id):
+    user = _require_user()
+    client_id = db.session.execute(db.select(Job.client_id).where(Job.id == job_id)).scalar()
+    if client_id is None:
+        abort(404)
+    if user.role != "Admin" and user.id != client_id:
+        abort(403)
+    names = APPLICATIONS.requested_fields()
+    query = APPLICATIONS.query(names, "created_at").filter(Application.job_id == job_id)
+    return _page(APPLICATIONS, query, "created_at", names)
+
+
+# 🔹 Projects
+@api_bp.route("/projects")
+def projects():
+    user = _require_user()
+    names = PROJECTS.requested_fields()
+    query = PROJECTS.query(names, "created_at")
+    if user.role == "Client":
+        query = query.filter(Project.client_id == user.id)
+    elif user.role == "Student":
+        query = query.filter(Project.student_id == user.id)
+    elif user.role != "Admin":
+        abort(403)
+    return _page(PROJECTS, query, "created_at", names)
+
+
+@api_bp.route("/projects/<int:project_id>")
+def project(project_id):
+    _project_participant(project_id)
+    names = PROJECTS.requested_fields()
+    return _one(PROJECTS.query(names).filter(Project.id == project_id), names)
+
+
+@api_bp.route("/projects/<int:project_id>/messages")
+def project_messages(project_id):
+    _project_participant(project_id)
+    names = MESSAGES.requested_fields()
+    query = MESSAGES.query(names, "timestamp").filter(Message.project_id == project_id)
+    return _page(MESSAGES, query, "timestamp", names)
+
+
+# 🔹 Blogs
+@api_bp.route("/blogs")
+def blogs():
+    names = BLOGS.requested_fields()
+    query = BLOGS.query(names, "created_at").filter(Blog.status == "approved")
+    return _page(BLOGS, query, "created_at", names)
+
+
+@api_bp.route("/blogs/<int:blog_id>")
+def blog(blog_id):
+    names = BLOGS.requested_fields()
+    query = BLOGS.query(names).filter(Blog.id == blog_id)
+    # Unapproved posts are visible to their author and admins only
+    if not current_user.is_authenticated or current_user.role != "Admin":
+        visible = Blog.status == "approved"
+        if current_user.is_authenticated:
+            visible = visible | (Blog.author_id == current_user.id)
+        query = query.filter(visible)
+    return _one(query, names)
+
+
+# 🔹 Portfolios
+@api_bp.route("/students/<int:student_id>")
+def student(student_id):
+    names = STUDENTS.requested_fields()
+    row = (
+        STUDENTS.query(names)
+        .filter(User.id == student_id, User.role == "Student")
+        .first()
+    )
+    if row is None:
+        abort(404)
+    body = _row_json(row, names)
+
+    # Verified projects with their job title and review summary, one query
+    projects = db.session.execute(
+        db.select(
+            Project.id,
+            Job.title.label("job_title"),
+            Project.created_at,
+            db.func.avg(Review.rating).label("rating"),
+        )
+        .select_from(Project)
+        .outerjoin(Job, Job.id == Project.job_id)
+        .outerjoin(Review, Review.project_id == Project.id)
+        .where(Project.student_id == student_id, Project.verified.is_(True))
+        .group_by(Project.id, Job.title, Project.created_at)
+        .order_by(Project.created_at.desc())
+    )
+    body["projects"] = [_row_json(p, ("id", "job_title", "created_at", "rating")) for p in projects]
+    return _conditional(body)
@@ -1,4 +1,4 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
 from flask_login import login_user, logout_user, login_required
 from werkzeug.security import generate_password_hash, check_password_hash
 from models import db, User
@@ -6,30 +6,35 @@ from models import db, User
 auth_bp = Blueprint("auth", __name__)
 
 from flask_login import current_user
-from models import Blog, Job, User
+from models import Blog, Job, User, replica_reads
+from queries import blogs_by_status_query, open_jobs_query
+from pagination import keyset_paginate, page_json, paginate_request, wants_json
+from serializers import job_json
+from cache import page_cache
 
 @auth_bp.route("/")
+@replica_reads
 def index():
-    blogs = Blog.query.filter_by(status="approved").order_by(Blog.created_at.desc()).all()
+    show_jobs = current_user.is_authenticated and current_user.role == "Student"
+    if show_jobs and wants_json():
+        jobs = paginate_request(open_jobs_query(), Job.created_at, Job.id)
+        return jsonify(page_json(jobs, job_json))
 
-    jobs = []
-    user_posts = []
+    def render_jobs():
+        jobs = paginate_request(open_jobs_query(), Job.created_at, Job.id) if show_jobs else []
+        return render_template("fragments/index_jobs.html", jobs=jobs)
 
-    if current_user.is_authenticated:
-        if current_user.role == "Student":
-            jobs = Job.query.filter_by(status="open").order_by(Job.created_at.desc()).all()
-            user_posts = Blog.query.join(User).filter(User.role == "Client", Blog.status=="approved").order_by(Blog.created_at.desc()).all()
+    def render_blogs():
+        # Latest blogs only; the full list lives at blog.all_blogs
+        blogs = keyset_paginate(blogs_by_status_query("approved"), Blog.created_at, Blog.id)
+        return render_template("fragments/index_blogs.html", blogs=blogs)
 
-        elif current_user.role == "Client":
-            user_posts = Blog.query.join(User).filter(User.role == "Student", Blog.status=="approved").order_by(Blog.created_at.desc()).all()
+    jobs_html = page_cache.fragment("index-jobs", ["job", "user"], render_jobs,
+                                    vary=(request.args.get("cursor"),))
+    blogs_html = page_cache.fragment("index-blogs", ["blog", "user"], render_blogs)
+    return render_template("index.html", jobs_html=jobs_html, blogs_html=blogs_html)
 
-    return render_template("index.html", blogs=blogs, jobs=jobs, user_posts=user_posts)
-
-import os
-from werkzeug.utils import secure_filename
-
-UPLOAD_FOLDER = "static/proofs"
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+from uploads import store_upload
 
 @auth_bp.route("/register", methods=["GET","POST"])
 def register():
@@ -46,6 +51,10 @@ def register():
         contact_number = request.form.get("contact_number") if role == "Client" else None
         website = request.form.get("website") if role == "Client" else None
 
+        if role == "Admin":
+            flash("You cannot register as Admin directly!", "danger")
+            return redirect(url_for("auth.register"))
+
         # Handle proof file
         proof = None
         if role == "Student":
@@ -53,15 +62,7 @@ def register():
         elif role == "Client":
          proof = request.files.get("client_proof")
 
-        proof_path = None
-        if proof and proof.filename:
-            filename = secure_filename(proof.filename)
-            proof.save(os.path.join(UPLOAD_FOLDER, filename))
-            proof_path = f"proofs/{filename}"
-
-        if role == "Admin":
-            flash("You cannot register as Admin directly!", "danger")
-            return redirect(url_for("auth.register"))
+        proof_path = store_upload(proof, "proofs", kind="proof")
 
         user = User(
             username=username,
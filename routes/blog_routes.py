@@ -1,14 +1,28 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
 from flask_login import login_required, current_user
-from models import db, Blog
+from models import db, Blog, replica_reads
+from queries import blogs_by_status_query
+from pagination import page_json, paginate_request, wants_json
+from serializers import blog_json
+from cache import page_cache
 
 blog_bp = Blueprint("blog", __name__, url_prefix="/blog")
 
 # 🔹 Show all approved blogs
 @blog_bp.route("/all")
+@replica_reads
 def all_blogs():
-    blogs = Blog.query.filter_by(status="approved").order_by(Blog.created_at.desc()).all()
-    return render_template("blogs.html", blogs=blogs)
+    if wants_json():
+        blogs = paginate_request(blogs_by_status_query("approved"), Blog.created_at, Blog.id)
+        return jsonify(page_json(blogs, blog_json))
+
+    def render_blogs():
+        blogs = paginate_request(blogs_by_status_query("approved"), Blog.created_at, Blog.id)
+        return render_template("fragments/blog_list.html", blogs=blogs)
+
+    blogs_html = page_cache.fragment("blog-list", ["blog", "user"], render_blogs,
+                                     vary=(request.args.get("cursor"),))
+    return render_template("blogs.html", blogs_html=blogs_html)
 
 # 🔹 Post a new blog
 @blog_bp.route("/post", methods=["GET", "POST"])
@@ -51,4 +65,7 @@ def explore_home():
         {"title": "AI Breakthrough", "content": "New AI model sets records...", "date": "2025-09-20"},
         {"title": "SpaceX Update", "content": "Starship prepares for launch...", "date": "2025-09-19"}
     ]
-    return render_template("explore.html", tech_news=tech_news)
+    news_html = page_cache.fragment(
+        "explore-news", [], lambda: render_template("fragments/explore_news.html", tech_news=tech_news)
+    )
+    return render_template("explore.html", news_html=news_html)
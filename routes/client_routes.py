@@ -1,6 +1,11 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, abort
+from flask import Blueprint, render_template, request, redirect, url_for, flash, abort, jsonify
 from flask_login import login_required, current_user
-from models import db, Job, Application, Project,Payment
+from models import db, Job, Application, Project, recount_job_counters
+from queries import client_jobs_query, client_projects_query
+from tasks import notify_project_approved
+from ledger import lifetime_total, month_total, monthly_history
+from pagination import wants_json
+from serializers import earnings_json
 import secrets
 
 client_bp = Blueprint("client", __name__, url_prefix="/client")
@@ -10,9 +15,23 @@ client_bp = Blueprint("client", __name__, url_prefix="/client")
 def dashboard():
     if current_user.role != "Client":
         abort(403)
-    jobs = Job.query.filter_by(client_id=current_user.id).all()
-    projects = Project.query.filter_by(client_id=current_user.id).all()
-    return render_template("client_dashboard.html", jobs=jobs, projects=projects)
+    jobs = client_jobs_query(current_user.id).all()
+    projects = client_projects_query(current_user.id).all()
+    monthly_spend = month_total(current_user.id, "spent")
+    return render_template("client_dashboard.html", jobs=jobs, projects=projects,
+                           monthly_spend=monthly_spend)
+
+@client_bp.route("/spending")
+@login_required
+def spending():
+    if current_user.role != "Client":
+        abort(403)
+    history = monthly_history(current_user.id, "spent")
+    lifetime, payment_count = lifetime_total(current_user.id, "spent")
+    if wants_json():
+        return jsonify(earnings_json(history, lifetime, payment_count))
+    return render_template("earnings.html", title="My Spending", history=history,
+                           lifetime=lifetime, payment_count=payment_count)
 
 @client_bp.route("/post_job", methods=["GET","POST"])
 @login_required
@@ -51,16 +70,8 @@ def approve_project(project_id):
 
     project.status = "awaiting_code"
     project.approval_code = secrets.token_hex(4).upper()
+    notify_project_approved(project)
     db.session.commit()
-    payment = Payment(
-        project_id=project.id,
-        payer_id=current_user.id,        # client
-        payee_id=project.student_id,     # student
-        amount=project.job.budget,       # use job budget
-        status="completed")
-    
-    db.session.add(payment)
-    db.session.commit
 
     flash(f"Project approved! Here is Payment of ${project.job.budget} and approval code  {project.approval_code}", "success")
     return redirect(url_for("client.dashboard"))
@@ -69,30 +80,50 @@ def approve_project(project_id):
 @login_required
 def assign_application(app_id):
     app = Application.query.get_or_404(app_id)
-    job = app.job
+    job_id = app.job_id
+    client_id = db.session.execute(db.select(Job.client_id).where(Job.id == job_id)).scalar()
 
     # Ensure only the job owner (client) can assign
-    if current_user.id != job.client_id:
+    if current_user.id != client_id:
         abort(403)
 
-    # Close the job
-    job.status = "closed"
+    # Close the job only if it is still open. The conditional UPDATE row-locks
+    # the job, so of two concurrent accepts exactly one sees rowcount 1; the
+    # other waits for it and then matches nothing.
+    closed = db.session.execute(
+        db.update(Job).where(Job.id == job_id, Job.status == "open").values(status="closed"),
+        execution_options={"synchronize_session": False},
+    ).rowcount
+    if not closed:
+        db.session.rollback()
+        if wants_json():
+            return jsonify({"error": "Conflict", "description": "This job is already closed."}), 409
+        flash("This job is already closed; another application was accepted.", "warning")
+        return redirect(url_for("student.job_detail", job_id=job_id))
 
-    # Mark this application as accepted, others as rejected
-    app.status = "accepted"
-    for other in job.applications:
-        if other.id != app.id:
-            other.status = "rejected"
+    # Accept this application and reject every pending one, in one statement
+    db.session.execute(
+        db.update(Application)
+        .where(Application.job_id == job_id,
+               db.or_(Application.id == app.id, Application.status == "pending"))
+        .values(status=db.case((Application.id == app.id, "accepted"), else_="rejected")),
+        execution_options={"synchronize_session": False},
+    )
+    # Bulk UPDATEs skip the counter events and the cache's flush hook
+    db.session.execute(recount_job_counters(Job.id == job_id))
+    db.session.info.setdefault("changed_namespaces", set()).add("job")
 
     # Create a project
     project = Project(
-        job_id=job.id,
+        job_id=job_id,
         student_id=app.student_id,
-        client_id=job.client_id,
+        client_id=client_id,
         status="in_progress"
     )
     db.session.add(project)
     db.session.commit()
 
+    if wants_json():
+        return jsonify({"project_id": project.id}), 201
     flash("Application accepted. Project created!", "success")
     return redirect(url_for("client.dashboard"))
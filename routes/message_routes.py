@@ -1,16 +1,58 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, abort
+from flask import Blueprint, render_template, request, redirect, url_for, flash, abort, jsonify
+from flask import Response, current_app, stream_with_context
 from flask_login import login_required, current_user
+from sqlalchemy import event
+from sqlalchemy.orm import Session
 from models import db, Project, Message
-import secrets
+from queries import project_messages_query, project_messages_since_query
+from pagination import page_json, paginate_request, wants_json
+from serializers import message_json
+from pubsub import broker
+from tasks import notify_project_approved
+import json, queue, secrets, time
 
 message_bp = Blueprint("message", __name__, url_prefix="/project")
 
-@message_bp.route("/<int:project_id>/messages", methods=["GET","POST"])
-@login_required
-def project_messages(project_id):
+
+# 🔹 Publish new message ids once their transaction commits
+@event.listens_for(Session, "after_flush")
+def _collect_new_messages(session, flush_context):
+    for obj in session.new:
+        if isinstance(obj, Message) and obj.project_id is not None:
+            session.info.setdefault("new_messages", []).append((obj.project_id, obj.id))
+
+@event.listens_for(Session, "after_commit")
+def _publish_new_messages(session):
+    for project_id, message_id in session.info.pop("new_messages", []):
+        broker.publish(project_id, message_id)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_new_messages(session):
+    session.info.pop("new_messages", None)
+
+
+def _thread_project(project_id):
     project = Project.query.get_or_404(project_id)
     if current_user.id not in [project.client_id, project.student_id]:
         abort(403)
+    return project
+
+def _since_id():
+    # An EventSource reconnect repeats the original URL; its Last-Event-ID is newer
+    since = request.headers.get("Last-Event-ID") or request.args.get("since_id", 0)
+    try:
+        return int(since)
+    except ValueError:
+        abort(400, description="Invalid since_id")
+
+def _messages_since(project_id, since_id):
+    limit = current_app.config.get("CHAT_BATCH_SIZE", 100)
+    return project_messages_since_query(project_id, since_id).limit(limit).all()
+
+@message_bp.route("/<int:project_id>/messages", methods=["GET","POST"])
+@login_required
+def project_messages(project_id):
+    project = _thread_project(project_id)
 
     if request.method == "POST":
         # normal text message
@@ -18,29 +60,82 @@ def project_messages(project_id):
             text = request.form["message_text"].strip()
             if text:
                 receiver_id = project.student_id if current_user.id == project.client_id else project.client_id
-                msg = Message(sender_id=current_user.id, receiver_id=receiver_id, message_text=text)
+                msg = Message(sender_id=current_user.id, receiver_id=receiver_id,
+                              project_id=project.id, message_text=text)
                 db.session.add(msg)
                 db.session.commit()
+                if wants_json():
+                    return jsonify(message_json(msg)), 201
                 flash("Message sent!", "success")
 
         # client approves project and sends approval code
         elif "approve_project" in request.form and current_user.id == project.client_id:
             project.status = "awaiting_code"
             project.approval_code = secrets.token_hex(4).upper()
-            db.session.commit()
-
-            msg_text = f"✅ Project Approved! Approval Code: <b>{project.approval_code}</b>"
-            msg = Message(sender_id=current_user.id, receiver_id=project.student_id, message_text=msg_text)
-            db.session.add(msg)
+            notify_project_approved(project, record_payment=False)
             db.session.commit()
 
             flash("Project approved and code sent to student!", "success")
 
         return redirect(url_for("message.project_messages", project_id=project.id))
 
-    messages = Message.query.filter(
-        ((Message.sender_id == project.client_id) & (Message.receiver_id == project.student_id)) |
-        ((Message.sender_id == project.student_id) & (Message.receiver_id == project.client_id))
-    ).order_by(Message.timestamp.asc()).all()
+    # Newest page first; the template shows it oldest-first with a link to earlier messages
+    page = paginate_request(project_messages_query(project), Message.timestamp, Message.id)
+    if wants_json():
+        return jsonify(page_json(page, message_json))
+    messages = list(reversed(page.items))
+
+    return render_template("messages.html", project=project, messages=messages, page=page)
+
+
+# 🔹 Live updates: SSE stream with a polling fallback
+@message_bp.route("/<int:project_id>/messages/poll")
+@login_required
+def poll_messages(project_id):
+    project = _thread_project(project_id)
+    since_id = _since_id()
+    messages = _messages_since(project.id, since_id)
+    last_id = messages[-1].id if messages else since_id
+    return jsonify({"items": [message_json(m) for m in messages], "last_id": last_id})
+
+@message_bp.route("/<int:project_id>/messages/stream")
+@login_required
+def stream_messages(project_id):
+    project = _thread_project(project_id)
+    since_id = _since_id()
+    keepalive = current_app.config.get("CHAT_KEEPALIVE", 15)
+    lifetime = current_app.config.get("CHAT_STREAM_LIFETIME", 300)
+    retry_ms = current_app.config.get("CHAT_STREAM_RETRY_MS", 2000)
+    channel = project.id
+    # Release the connection; the stream only reopens one to fetch deltas
+    db.session.remove()
+
+    def events():
+        # Each stream holds a worker thread, so it ends after ``lifetime`` seconds;
+        # the browser reconnects after ``retry`` with Last-Event-ID and resumes
+        last_id = since_id
+        deadline = time.monotonic() + lifetime
+        inbox = broker.subscribe(channel)
+        try:
+            yield f"retry: {retry_ms}\n\n"
+            while True:
+                for msg in _messages_since(channel, last_id):
+                    last_id = msg.id
+                    yield f"id: {msg.id}\ndata: {json.dumps(message_json(msg))}\n\n"
+                db.session.remove()
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                try:
+                    inbox.get(timeout=min(keepalive, remaining))
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                # One catch-up query covers every id queued meanwhile
+                while not inbox.empty():
+                    inbox.get_nowait()
+        finally:
+            broker.unsubscribe(channel, inbox)
 
-    return render_template("messages.html", project=project, messages=messages)
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return Response(stream_with_context(events()), mimetype="text/event-stream", headers=headers)
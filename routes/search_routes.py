@@ -0,0 +1,27 @@
+from flask import Blueprint, render_template, request, jsonify
+from search import search_jobs, search_blogs, search_students
+from pagination import wants_json
+from serializers import job_json, blog_json, student_json
+
+search_bp = Blueprint("search", __name__, url_prefix="/search")
+
+SEARCH_LIMIT = 20
+
+# 🔹 Search jobs, blogs and students
+@search_bp.route("/")
+def search():
+    q = request.args.get("q", "").strip()
+    kind = request.args.get("type", "all")
+
+    jobs = search_jobs(q, SEARCH_LIMIT) if kind in ("all", "jobs") else []
+    blogs = search_blogs(q, SEARCH_LIMIT) if kind in ("all", "blogs") else []
+    students = search_students(q, SEARCH_LIMIT) if kind in ("all", "students") else []
+
+    if wants_json():
+        return jsonify({
+            "query": q,
+            "jobs": [job_json(j) for j in jobs],
+            "blogs": [blog_json(b) for b in blogs],
+            "students": [student_json(s) for s in students],
+        })
+    return render_template("search.html", q=q, kind=kind, jobs=jobs, blogs=blogs, students=students)
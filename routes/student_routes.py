@@ -1,19 +1,21 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash, abort
+from flask import Blueprint, render_template, request, redirect, url_for, flash, abort, jsonify
 from flask_login import login_required, current_user
-from models import db, Job, Application, Project, Review ,User,Blog
-import os, secrets
-from werkzeug.utils import secure_filename
-from datetime import datetime
+from models import db, Job, Application, Project, User, Blog
+from uploads import store_upload
+from tasks import enqueue
 
 student_bp = Blueprint("student", __name__, url_prefix="/student")
 
-UPLOAD_FOLDER = "static/uploads"
-
 from flask import Blueprint, render_template
 from flask_login import login_required, current_user
-from datetime import datetime
-from sqlalchemy import extract
-from models import db, Job, Project, Payment
+from sqlalchemy.orm import undefer, undefer_group
+from models import db, Job, Project, replica_reads
+from queries import job_applications_query, open_jobs_query, student_projects_query, verified_projects_query
+from pagination import page_json, paginate_request, wants_json
+from serializers import application_json, earnings_json, job_json
+from matching import candidate_students, recommended_jobs
+from cache import page_cache
+from ledger import lifetime_total, month_total, monthly_history
 
 student_bp = Blueprint("student", __name__, url_prefix="/student")
 
@@ -24,37 +26,45 @@ def dashboard():
         abort(403)
 
     # Jobs available
-    jobs = Job.query.filter_by(status="open").all()
+    jobs = paginate_request(open_jobs_query(), Job.created_at, Job.id)
+    if wants_json():
+        return jsonify(page_json(jobs, job_json))
+
+    # Best skill matches among open jobs
+    recommended = recommended_jobs(current_user.id, limit=5)
 
     # Projects assigned to student
-    projects = Project.query.filter_by(student_id=current_user.id).all()
-
-    # ✅ Calculate Monthly Earnings
-    now = datetime.utcnow()
-    monthly_payments = (
-        db.session.query(Payment)
-        .filter(
-            Payment.payee_id == current_user.id,  # logged in student
-            Payment.status == "completed",       # only completed payments
-            extract("year", Payment.created_at) == now.year,
-            extract("month", Payment.created_at) == now.month,
-        )
-        .all()
-    )
-    monthly_earnings = sum(p.amount for p in monthly_payments)
+    projects = student_projects_query(current_user.id).all()
+
+    # ✅ Monthly Earnings from the ledger (one primary-key lookup)
+    monthly_earnings = month_total(current_user.id, "earned")
 
     return render_template(
         "jobs.html",
         jobs=jobs,
+        recommended=recommended,
         projects=projects,
         monthly_earnings=monthly_earnings
     )
 
 
+
+@student_bp.route("/earnings")
+@login_required
+def earnings():
+    if current_user.role != "Student":
+        abort(403)
+    history = monthly_history(current_user.id, "earned")
+    lifetime, payment_count = lifetime_total(current_user.id, "earned")
+    if wants_json():
+        return jsonify(earnings_json(history, lifetime, payment_count))
+    return render_template("earnings.html", title="My Earnings", history=history,
+                           lifetime=lifetime, payment_count=payment_count)
+
 @student_bp.route("/job/<int:job_id>", methods=["GET","POST"])
 @login_required
 def job_detail(job_id):
-    job = Job.query.get_or_404(job_id)
+    job = Job.query.options(undefer(Job.description)).get_or_404(job_id)
     if request.method == "POST":
         if current_user.role != "Student":
             abort(403)
@@ -68,10 +78,15 @@ def job_detail(job_id):
             db.session.commit()
             flash("Applied successfully!", "success")
         return redirect(url_for("student.job_detail", job_id=job.id))
-    applications = Application.query.filter_by(job_id=job.id).all()
-    return render_template("job_detail.html", job=job, applications=applications)
+    applications = paginate_request(job_applications_query(job.id), Application.created_at, Application.id)
+    if wants_json():
+        return jsonify(page_json(applications, application_json))
 
-from models import Message  # make sure to import
+    # Suggest matching students to the job owner while the job is open
+    candidates = []
+    if current_user.id == job.client_id and job.status == "open":
+        candidates = candidate_students(job.id, limit=5)
+    return render_template("job_detail.html", job=job, applications=applications, candidates=candidates)
 
 @student_bp.route("/project/<int:project_id>/update", methods=["GET","POST"])
 @login_required
@@ -81,31 +96,24 @@ def update_project(project_id):
         abort(403)
 
     if request.method == "POST":
-        project.progress = request.form.get("progress")
+        # Store the file before touching the project so no transaction is held during the copy
+        file_link = store_upload(request.files.get("final_file"), "uploads", kind="final_file")
 
-        file = request.files.get("final_file")
-        file_link = None
-        if file and file.filename:
-            filename = secure_filename(file.filename)
-            path = os.path.join(UPLOAD_FOLDER, filename)
-            file.save(path)
-            project.final_file = f"uploads/{filename}"
+        project.progress = request.form.get("progress")
+        if file_link:
+            project.final_file = file_link
             project.status = "submitted"
-            file_link = project.final_file
-
-        db.session.commit()
 
-        # 🔹 Send system message to client
+        # 🔹 System message and email to the client go out via the task queue
         msg_text = f"📌 Progress Update: {project.progress or 'No details'}"
         if file_link:
             msg_text += f"\n📂 Final File uploaded: <a href='/static/{file_link}' target='_blank'>Download</a>"
-
-        msg = Message(
-            sender_id=current_user.id,
-            receiver_id=project.client_id,
-            message_text=msg_text
-        )
-        db.session.add(msg)
+        enqueue("project_message", sender_id=current_user.id, receiver_id=project.client_id,
+                project_id=project.id, text=msg_text)
+        enqueue("send_email", user_id=project.client_id,
+                subject=f"Progress update on project #{project.id}",
+                body=f"{current_user.username} posted an update: {project.progress or 'No details'}"
+                     + ("\nA final file has been uploaded." if file_link else ""))
         db.session.commit()
 
         flash("Project updated and client notified!", "success")
@@ -136,10 +144,17 @@ def submit_code():
     return render_template("submit_code.html")
 
 @student_bp.route("/portfolio/<int:student_id>")
+@replica_reads
 def portfolio(student_id):
-    student = User.query.get_or_404(student_id)
-    projects = Project.query.filter_by(student_id=student.id, verified=True).all()
-    return render_template("portfolio.html", student=student, projects=projects)
+    student = User.query.options(undefer_group("profile")).get_or_404(student_id)
+
+    def render_projects():
+        projects = verified_projects_query(student.id).all()
+        return render_template("fragments/portfolio_projects.html", projects=projects)
+
+    projects_html = page_cache.fragment("portfolio-projects", ["project", "review", "job", "user"],
+                                        render_projects, vary=(student.id,))
+    return render_template("portfolio.html", student=student, projects_html=projects_html)
 
 @student_bp.route("/edit_profile", methods=["GET", "POST"])
 @login_required
@@ -148,30 +163,23 @@ def edit_profile():
         abort(403)
 
     if request.method == "POST":
-        current_user.bio = request.form.get("bio")
-        current_user.skills = request.form.get("skills")
-
-        # Resume upload
-        file = request.files.get("resume")
-        if file and file.filename:
-            filename = secure_filename(file.filename)
-            path = os.path.join(UPLOAD_FOLDER, filename)
-            file.save(path)
-            current_user.resume = f"uploads/{filename}"
-
-        # Profile picture upload
-        pic = request.files.get("profile_pic")
-        if pic and pic.filename:
-            filename = secure_filename("pic_" + str(current_user.id) + "_" + pic.filename)
-            path = os.path.join(UPLOAD_FOLDER, filename)
-            pic.save(path)
-            current_user.profile_pic = f"uploads/{filename}"
+        # Store uploads first so no transaction is held during the copy
+        resume = store_upload(request.files.get("resume"), "uploads", kind="resume")
+        pic = store_upload(request.files.get("profile_pic"), "uploads", kind="profile_pic")
+
+        student = current_user.user
+        student.bio = request.form.get("bio")
+        student.skills = request.form.get("skills")
+        if resume:
+            student.resume = resume
+        if pic:
+            student.profile_pic = pic
 
         db.session.commit()
         flash("Profile updated!", "success")
         return redirect(url_for("student.portfolio", student_id=current_user.id))
 
-    return render_template("edit_profile.html", student=current_user)
+    return render_template("edit_profile.html", student=current_user.user)
 
 @student_bp.route("/post_blog", methods=["GET", "POST"])
 @login_required
@@ -0,0 +1,134 @@
+"""Full-text search over jobs, blogs and student profiles.
+
+Backed by SQLite FTS5 external-content tables that triggers keep in sync
+with ``job``, ``blog`` and ``user``; results are ranked with bm25 and
+title/username matches weigh more than body text. Other databases fall
+back to a LIKE scan so the routes keep working, just slower.
+"""
+import re
+from sqlalchemy import event, or_, text
+from sqlalchemy.orm import joinedload, undefer
+from models import db, User, Job, Blog
+
+# fts table -> (source table, indexed columns, bm25 column weights)
+FTS_TABLES = {
+    "job_fts": ("job", ("title", "description"), (10.0, 1.0)),
+    "blog_fts": ("blog", ("title", "content"), (10.0, 1.0)),
+    "user_fts": ("user", ("username", "skills", "bio"), (5.0, 10.0, 1.0)),
+}
+
+
+def _fts_ddl(fts, source, columns):
+    cols = ", ".join(columns)
+    new = ", ".join(f"new.{c}" for c in columns)
+    old = ", ".join(f"old.{c}" for c in columns)
+    return [
+        f'CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, '
+        f'content="{source}", content_rowid="id", tokenize="unicode61 remove_diacritics 2")',
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON "{source}" BEGIN '
+        f'INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END',
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON "{source}" BEGIN '
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); END",
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON "{source}" BEGIN '
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+    ]
+
+
+def install_search_index(connection):
+    """Create the FTS tables and sync triggers (idempotent)."""
+    if connection.dialect.name != "sqlite":
+        return
+    for fts, (source, columns, _) in FTS_TABLES.items():
+        for statement in _fts_ddl(fts, source, columns):
+            connection.exec_driver_sql(statement)
+
+
+@event.listens_for(db.metadata, "after_create")
+def _install_after_create(target, connection, **kw):
+    install_search_index(connection)
+
+
+def rebuild_search_index():
+    """Repopulate every FTS table from its source table."""
+    if db.engine.dialect.name != "sqlite":
+        return
+    install_search_index(db.session.connection())
+    for fts in FTS_TABLES:
+        db.session.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+    db.session.commit()
+
+
+def _match_expression(query):
+    """Turn free text into a safe FTS5 query: every word must match, the last as a prefix."""
+    words = re.findall(r"\w+", query or "")
+    if not words:
+        return None
+    terms = [f'"{w}"' for w in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def _ranked_ids(fts, match, where, limit):
+    source, _, weights = FTS_TABLES[fts]
+    weight_args = ", ".join(str(w) for w in weights)
+    rows = db.session.execute(
+        text(
+            f'SELECT src.id FROM {fts} JOIN "{source}" AS src ON src.id = {fts}.rowid '
+            f"WHERE {fts} MATCH :match AND {where} "
+            f"ORDER BY bm25({fts}, {weight_args}) LIMIT :limit"
+        ),
+        {"match": match, "limit": limit},
+    )
+    return [row[0] for row in rows]
+
+
+def _in_rank_order(query, model, ids):
+    if not ids:
+        return []
+    by_id = {obj.id: obj for obj in query.filter(model.id.in_(ids))}
+    return [by_id[i] for i in ids if i in by_id]
+
+
+def _like(columns, query):
+    pattern = f"%{query}%"
+    return or_(*[column.ilike(pattern) for column in columns])
+
+
+def search_jobs(query, limit=20):
+    """Open jobs matching ``query``, best match first."""
+    match = _match_expression(query)
+    if match is None:
+        return []
+    base = Job.query.options(joinedload(Job.client))
+    if db.engine.dialect.name != "sqlite":
+        return base.filter(Job.status == "open", _like([Job.title, Job.description], query)).limit(limit).all()
+    ids = _ranked_ids("job_fts", match, "src.status = 'open'", limit)
+    return _in_rank_order(base, Job, ids)
+
+
+def search_blogs(query, limit=20):
+    """Approved blogs matching ``query``, best match first."""
+    match = _match_expression(query)
+    if match is None:
+        return []
+    base = Blog.query.options(joinedload(Blog.author))
+    if db.engine.dialect.name != "sqlite":
+        return base.filter(Blog.status == "approved", _like([Blog.title, Blog.content], query)).limit(limit).all()
+    ids = _ranked_ids("blog_fts", match, "src.status = 'approved'", limit)
+    return _in_rank_order(base, Blog, ids)
+
+
+def search_students(query, limit=20):
+    """Approved students whose username, skills or bio match ``query``."""
+    match = _match_expression(query)
+    if match is None:
+        return []
+    base = User.query.options(undefer(User.skills))
+    if db.engine.dialect.name != "sqlite":
+        return base.filter(
+            User.role == "Student", User.status == "approved",
+            _like([User.username, User.skills, User.bio], query),
+        ).limit(limit).all()
+    ids = _ranked_ids("user_fts", match, "src.role = 'Student' AND src.status = 'approved'", limit)
+    return _in_rank_order(base, User, ids)
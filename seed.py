@@ -0,0 +1,246 @@
+"""Synthetic data for load testing and benchmarks.
+
+``seed_database(scale)`` fills an empty database with a realistic-looking
+marketplace: at ``scale=1.0`` that is 100k users, 200k jobs, 200k
+applications, 1M project messages and the reviews, payments and blogs
+that go with them (smaller scales shrink every table proportionally).
+Rows are written with batched Core inserts and explicit ids, so the ORM
+events that normally maintain derived data don't fire; the rating
+aggregates, job application counters, earnings ledger, matching vectors
+and search index are rebuilt once at the end instead.
+
+The same ``seed`` value always produces the same data, so benchmark runs
+against a freshly seeded database are comparable.
+"""
+import random
+from datetime import datetime, timedelta
+from werkzeug.security import generate_password_hash
+from models import (
+    db, User, Job, Application, Project, Message, Payment, Review, Blog,
+    backfill_student_ratings, excerpt, reconcile_job_counters,
+)
+
+BATCH_SIZE = 5000
+PASSWORD = "password"  # every seeded account
+
+# Row counts at scale 1.0
+SIZES = {
+    "users": 100_000,
+    "jobs": 200_000,
+    "applications": 200_000,
+    "messages": 1_000_000,
+    "blogs": 20_000,
+}
+ADMINS = 5
+CLIENT_SHARE = 0.25       # of non-admin users
+CLOSED_JOB_SHARE = 0.2    # closed jobs get a project
+COMPLETED_SHARE = 0.5     # of projects; completed ones get a review and a payment
+
+SKILLS = (
+    "python", "flask", "django", "javascript", "react", "vue", "node", "sql",
+    "postgres", "docker", "aws", "figma", "ui design", "copywriting", "seo",
+    "data analysis", "pandas", "machine learning", "excel", "video editing",
+    "photoshop", "java", "kotlin", "swift", "flutter", "c++", "go", "rust",
+)
+JOB_KINDS = (
+    "landing page", "REST API", "mobile app", "logo", "blog articles", "dashboard",
+    "data cleanup", "chatbot", "scraper", "marketing video", "database schema",
+    "browser extension", "unit tests", "product photos",
+)
+WORDS = (
+    "deliver", "quality", "deadline", "budget", "experience", "client", "team",
+    "design", "feature", "review", "update", "feedback", "milestone", "test",
+    "deploy", "responsive", "clean", "documented", "weekly", "call", "draft",
+    "final", "revision", "scope", "requirements", "portfolio", "startup",
+)
+
+
+class _Generator:
+    def __init__(self, scale, seed, now):
+        self.rng = random.Random(seed)
+        self.now = now
+        self.counts = {name: max(1, int(size * scale)) for name, size in SIZES.items()}
+
+    def words(self, count):
+        return " ".join(self.rng.choice(WORDS) for _ in range(count))
+
+    def sentences(self, count, vocabulary=()):
+        rng = self.rng
+        parts = []
+        for _ in range(count):
+            text = self.words(rng.randint(6, 14))
+            if vocabulary:
+                text += " " + rng.choice(vocabulary)
+            parts.append(text.capitalize() + ".")
+        return " ".join(parts)
+
+    def moment(self, days_back=730, after=None):
+        """A timestamp in the last ``days_back`` days, not before ``after``."""
+        start = after or self.now - timedelta(days=days_back)
+        span = max((self.now - start).total_seconds(), 1)
+        return start + timedelta(seconds=self.rng.random() * span)
+
+
+def _insert(table, rows):
+    """Insert ``rows`` (any iterable of dicts) in batches; returns the row count."""
+    total = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            db.session.execute(db.insert(table), batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        db.session.execute(db.insert(table), batch)
+        total += len(batch)
+    return total
+
+
+def seed_database(scale=0.01, seed=42, log=print):
+    """Fill an empty database with synthetic data; returns row counts per table."""
+    if db.session.execute(db.select(User.id).limit(1)).first() is not None:
+        raise RuntimeError("The database already has users; seed an empty database")
+
+    gen = _Generator(scale, seed, datetime.utcnow())
+    rng = gen.rng
+    counts = gen.counts
+    password = generate_password_hash(PASSWORD)
+
+    # 🔹 Users: ids 1..ADMINS are admins, then clients, then students
+    user_count = max(counts["users"], ADMINS + 2)
+    client_count = max(1, int((user_count - ADMINS) * CLIENT_SHARE))
+    clients = range(ADMINS + 1, ADMINS + client_count + 1)
+    students = range(clients.stop, user_count + 1)
+
+    def users():
+        for user_id in range(1, user_count + 1):
+            row = {
+                "id": user_id, "password": password, "email": f"user{user_id}@example.com",
+                "status": "approved" if rng.random() < 0.92 else rng.choice(("pending", "rejected")),
+                "company_name": None, "skills": "", "bio": "", "rating_sum": 0, "rating_count": 0,
+            }
+            if user_id <= ADMINS:
+                row.update(username=f"admin{user_id}", role="Admin", status="approved")
+            elif user_id in clients:
+                row.update(username=f"client{user_id}", role="Client",
+                           company_name=f"{rng.choice(WORDS).title()} {rng.choice(('Labs', 'Studio', 'Ltd'))}",
+                           bio=gen.sentences(2))
+            else:
+                skills = rng.sample(SKILLS, rng.randint(2, 6))
+                row.update(username=f"student{user_id}", role="Student", skills=", ".join(skills),
+                           bio=gen.sentences(rng.randint(1, 4), skills))
+            yield row
+
+    log(f"users: {_insert(User.__table__, users())}")
+
+    # 🔹 Jobs; a share of them are closed and become projects
+    job_count = counts["jobs"]
+    job_owner = {}
+    job_created = {}
+    closed = set(rng.sample(range(1, job_count + 1), int(job_count * CLOSED_JOB_SHARE)))
+
+    def jobs():
+        for job_id in range(1, job_count + 1):
+            client_id = rng.choice(clients)
+            created = gen.moment()
+            job_owner[job_id] = client_id
+            job_created[job_id] = created
+            skills = rng.sample(SKILLS, rng.randint(1, 3))
+            description = gen.sentences(rng.randint(2, 8), skills)
+            yield {
+                "id": job_id, "client_id": client_id,
+                "title": f"{rng.choice(JOB_KINDS).title()} with {' and '.join(skills)}",
+                "description": description, "excerpt": excerpt(description),
+                "budget": float(rng.randrange(20, 5000, 5)),
+                "status": "closed" if job_id in closed else "open",
+                "created_at": created,
+            }
+
+    log(f"jobs: {_insert(Job.__table__, jobs())}")
+
+    # 🔹 Projects: one per closed job, with an accepted application
+    project_rows = []
+    for project_id, job_id in enumerate(sorted(closed), start=1):
+        completed = rng.random() < COMPLETED_SHARE
+        project_rows.append({
+            "id": project_id, "job_id": job_id, "student_id": rng.choice(students),
+            "client_id": job_owner[job_id],
+            "status": "completed" if completed else rng.choice(("in_progress", "submitted")),
+            "progress": gen.words(5), "verified": completed and rng.random() < 0.8,
+            "created_at": gen.moment(after=job_created[job_id]),
+        })
+    log(f"projects: {_insert(Project.__table__, project_rows)}")
+
+    def applications():
+        accepted = {(p["job_id"], p["student_id"]) for p in project_rows}
+        for job_id, student_id in sorted(accepted):
+            yield {"job_id": job_id, "student_id": student_id, "status": "accepted",
+                   "cover_letter": gen.sentences(2), "created_at": gen.moment(after=job_created[job_id])}
+        for _ in range(max(0, counts["applications"] - len(accepted))):
+            job_id = rng.randint(1, job_count)
+            yield {"job_id": job_id, "student_id": rng.choice(students),
+                   "status": "rejected" if job_id in closed else rng.choice(("pending", "pending", "rejected")),
+                   "cover_letter": gen.sentences(rng.randint(1, 3)),
+                   "created_at": gen.moment(after=job_created[job_id])}
+
+    log(f"applications: {_insert(Application.__table__, applications())}")
+
+    # 🔹 Messages, spread over project threads
+    def messages():
+        if not project_rows:
+            return
+        for _ in range(counts["messages"]):
+            project = rng.choice(project_rows)
+            from_client = rng.random() < 0.5
+            sender, receiver = project["client_id"], project["student_id"]
+            if not from_client:
+                sender, receiver = receiver, sender
+            yield {"project_id": project["id"], "sender_id": sender, "receiver_id": receiver,
+                   "message_text": gen.sentences(rng.randint(1, 3)),
+                   "timestamp": gen.moment(after=project["created_at"])}
+
+    log(f"messages: {_insert(Message.__table__, messages())}")
+
+    # 🔹 Reviews and payments for completed projects
+    completed = [p for p in project_rows if p["status"] == "completed"]
+
+    def reviews():
+        for p in completed:
+            yield {"project_id": p["id"], "reviewer_id": p["client_id"],
+                   "rating": rng.choices((1, 2, 3, 4, 5), weights=(2, 3, 10, 35, 50))[0],
+                   "text": gen.sentences(1), "created_at": gen.moment(after=p["created_at"])}
+
+    def payments():
+        for p in completed:
+            yield {"project_id": p["id"], "payer_id": p["client_id"], "payee_id": p["student_id"],
+                   "amount": float(rng.randrange(20, 5000, 5)), "status": "completed",
+                   "created_at": gen.moment(days_back=365, after=p["created_at"])}
+
+    log(f"reviews: {_insert(Review.__table__, reviews())}")
+    log(f"payments: {_insert(Payment.__table__, payments())}")
+
+    # 🔹 Blogs
+    def blogs():
+        authors = range(ADMINS + 1, user_count + 1)
+        for _ in range(counts["blogs"]):
+            content = gen.sentences(rng.randint(5, 25))
+            yield {"author_id": rng.choice(authors), "title": gen.words(rng.randint(3, 7)).title(),
+                   "content": content, "excerpt": excerpt(content),
+                   "status": "approved" if rng.random() < 0.85 else rng.choice(("pending", "rejected")),
+                   "created_at": gen.moment()}
+
+    log(f"blogs: {_insert(Blog.__table__, blogs())}")
+    db.session.commit()
+
+    # 🔹 Derived data the ORM events would normally maintain
+    import ledger
+    import matching
+    import search
+    log("rebuilding rating aggregates, job counters, earnings ledger, match vectors and search index")
+    backfill_student_ratings()
+    reconcile_job_counters()
+    ledger.rebuild_ledger()
+    matching.rebuild_vectors()
+    search.rebuild_search_index()
+    return counts
@@ -0,0 +1,66 @@
+"""JSON representations shared by the listing routes."""
+
+
+def job_json(job):
+    return {
+        "id": job.id,
+        "title": job.title,
+        "budget": job.budget,
+        "status": job.status,
+        "client": job.client.username,
+        "created_at": job.created_at.isoformat(),
+    }
+
+
+def application_json(app):
+    return {
+        "id": app.id,
+        "job_id": app.job_id,
+        "student_id": app.student_id,
+        "student": app.student.username,
+        "status": app.status,
+        "created_at": app.created_at.isoformat(),
+    }
+
+
+def blog_json(blog):
+    return {
+        "id": blog.id,
+        "title": blog.title,
+        "excerpt": blog.excerpt,
+        "author": blog.author.username,
+        "created_at": blog.created_at.isoformat(),
+    }
+
+
+def message_json(msg):
+    return {
+        "id": msg.id,
+        "sender_id": msg.sender_id,
+        "receiver_id": msg.receiver_id,
+        "project_id": msg.project_id,
+        "sender": msg.sender.username,
+        "message_text": msg.message_text,
+        "timestamp": msg.timestamp.isoformat(),
+    }
+
+
+def student_json(user):
+    return {
+        "id": user.id,
+        "username": user.username,
+        "skills": user.skills,
+        "badge": user.badge,
+        "average_rating": user.average_rating,
+    }
+
+
+def earnings_json(history, lifetime, payment_count):
+    return {
+        "months": [
+            {"month": first.strftime("%Y-%m"), "total": total, "payments": count}
+            for first, total, count in history
+        ],
+        "lifetime": lifetime,
+        "payments": payment_count,
+    }
@@ -0,0 +1,253 @@
+"""Database-backed task queue for request side effects.
+
+:func:`enqueue` adds a row to the ``task`` table inside the caller's
+transaction, so a side effect is recorded if and only if the primary
+write commits, and the request does not wait for it. A worker
+(``flask run-worker``, or a thread under ``python app.py``) claims due
+tasks one at a time, runs the registered handler and marks the task done
+in the same transaction as the handler's own writes.
+
+Failures are retried with exponential backoff; after ``max_attempts``
+the task is marked ``dead`` and copied to ``dead_task`` for inspection
+(``flask requeue-dead-tasks`` puts them back). An idempotency key makes
+enqueueing the same side effect twice a no-op.
+"""
+import json
+import logging
+import smtplib
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from flask import current_app
+from sqlalchemy import and_, event, or_
+from sqlalchemy.orm import Session
+from models import db, Task, DeadTask, Message, Payment, User
+
+log = logging.getLogger(__name__)
+
+_handlers = {}
+_wakeup = threading.Event()
+
+
+def task(name):
+    """Register the decorated function as the handler for ``name`` tasks."""
+    def decorator(func):
+        _handlers[name] = func
+        return func
+    return decorator
+
+
+def _insert_ignoring_duplicates(dialect):
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        return None
+    return insert(Task.__table__).on_conflict_do_nothing(index_elements=["idempotency_key"])
+
+
+def enqueue(name, key=None, delay=0, max_attempts=None, **payload):
+    """Queue ``name(**payload)`` in the current transaction.
+
+    Returns False when a task with the same idempotency ``key`` already
+    exists (whatever its status), True otherwise. Nothing runs until the
+    caller commits.
+    """
+    if name not in _handlers:
+        raise KeyError(f"No task handler registered for {name!r}")
+    values = {
+        "name": name,
+        "payload": json.dumps(payload),
+        "idempotency_key": key,
+        "status": "queued",
+        "attempts": 0,
+        "max_attempts": max_attempts or current_app.config.get("TASK_MAX_ATTEMPTS", 5),
+        "run_at": datetime.utcnow() + timedelta(seconds=delay),
+        "created_at": datetime.utcnow(),
+    }
+    db.session.info["tasks_enqueued"] = True
+
+    stmt = _insert_ignoring_duplicates(db.engine.dialect.name) if key else None
+    if stmt is not None:
+        return db.session.execute(stmt.values(**values)).rowcount > 0
+    if key and Task.query.filter_by(idempotency_key=key).first():
+        return False
+    db.session.add(Task(**values))
+    return True
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_worker(session):
+    if session.info.pop("tasks_enqueued", False):
+        _wakeup.set()
+
+@event.listens_for(Session, "after_rollback")
+def _discard_wakeup(session):
+    session.info.pop("tasks_enqueued", None)
+
+
+# 🔹 Worker
+def _claim_next():
+    """Atomically mark the next due task as running and return it, or None."""
+    now = datetime.utcnow()
+    stale = now - timedelta(seconds=current_app.config.get("TASK_LOCK_TIMEOUT", 300))
+    due = or_(
+        and_(Task.status == "queued", Task.run_at <= now),
+        and_(Task.status == "running", Task.locked_at < stale),  # worker died mid-task
+    )
+    task_id = db.session.execute(
+        db.select(Task.id).where(due).order_by(Task.run_at, Task.id).limit(1)
+    ).scalar()
+    if task_id is None:
+        db.session.rollback()
+        return None
+    # Conditional UPDATE so two workers can never claim the same row
+    claimed = db.session.execute(
+        db.update(Task)
+        .where(Task.id == task_id, due)
+        .values(status="running", attempts=Task.attempts + 1, locked_at=now)
+    ).rowcount
+    db.session.commit()
+    return db.session.get(Task, task_id) if claimed else None
+
+
+def _fail(task_id, error):
+    task = db.session.get(Task, task_id)
+    task.last_error = error
+    task.locked_at = None
+    if task.attempts >= task.max_attempts:
+        task.status = "dead"
+        db.session.add(DeadTask(task_id=task.id, name=task.name, payload=task.payload,
+                                attempts=task.attempts, error=error))
+        log.error("Task %s (%s) moved to dead letters after %d attempts",
+                  task.id, task.name, task.attempts)
+    else:
+        task.status = "queued"
+        task.run_at = datetime.utcnow() + timedelta(seconds=2 ** task.attempts)
+    db.session.commit()
+
+
+def run_next():
+    """Run one due task. Returns False when the queue had nothing due."""
+    task = _claim_next()
+    if task is None:
+        return False
+    task_id = task.id
+    try:
+        handler = _handlers[task.name]
+        handler(**json.loads(task.payload))
+        task.status = "done"
+        task.locked_at = None
+        task.last_error = None
+        db.session.commit()  # handler writes and the done mark land together
+    except Exception:
+        db.session.rollback()
+        log.exception("Task %s (%s) failed", task_id, task.name)
+        _fail(task_id, traceback.format_exc(limit=5))
+    return True
+
+
+def purge_done(days):
+    """Delete finished tasks without an idempotency key older than ``days``."""
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    deleted = db.session.execute(
+        db.delete(Task).where(
+            Task.status == "done", Task.idempotency_key.is_(None), Task.created_at < cutoff
+        )
+    ).rowcount
+    db.session.commit()
+    return deleted
+
+
+def run_worker(app, once=False, interval=None):
+    """Process tasks until interrupted (or until the queue is empty if ``once``)."""
+    interval = interval or app.config.get("TASK_POLL_INTERVAL", 1.0)
+    retention = app.config.get("TASK_RETENTION_DAYS", 7)
+    last_purge = 0
+    with app.app_context():
+        while True:
+            try:
+                if time.monotonic() - last_purge > 3600:
+                    purge_done(retention)
+                    last_purge = time.monotonic()
+                while run_next():
+                    pass
+            finally:
+                db.session.remove()
+            if once:
+                return
+            _wakeup.wait(interval)
+            _wakeup.clear()
+
+
+def start_worker_thread(app):
+    """Run the worker in a daemon thread of the web process (development)."""
+    thread = threading.Thread(target=run_worker, args=(app,), name="task-worker", daemon=True)
+    thread.start()
+    return thread
+
+
+def requeue_dead(task_ids=None):
+    """Move dead-lettered tasks back to the queue with a fresh retry budget."""
+    query = DeadTask.query
+    if task_ids:
+        query = query.filter(DeadTask.task_id.in_(task_ids))
+    dead = query.all()
+    for record in dead:
+        task = db.session.get(Task, record.task_id)
+        task.status = "queued"
+        task.attempts = 0
+        task.run_at = datetime.utcnow()
+        db.session.delete(record)
+    db.session.commit()
+    return len(dead)
+
+
+def notify_project_approved(project, record_payment=True):
+    """Queue the approval code message, student email and (optionally) payment."""
+    code_key = f"project:{project.id}:approved:{project.approval_code}"
+    enqueue("project_message", key=f"{code_key}:message",
+            sender_id=project.client_id, receiver_id=project.student_id, project_id=project.id,
+            text=f"✅ Project Approved! Approval Code: <b>{project.approval_code}</b>")
+    enqueue("send_email", key=f"{code_key}:email", user_id=project.student_id,
+            subject=f"Project #{project.id} approved",
+            body=f"Your project was approved. Approval code: {project.approval_code}")
+    if record_payment:
+        # One payment per project, however often it is approved
+        enqueue("record_payment", key=f"project:{project.id}:payment",
+                project_id=project.id, payer_id=project.client_id,
+                payee_id=project.student_id, amount=project.job.budget)
+
+
+# 🔹 Handlers
+@task("project_message")
+def project_message(sender_id, receiver_id, project_id, text):
+    db.session.add(Message(sender_id=sender_id, receiver_id=receiver_id,
+                           project_id=project_id, message_text=text))
+
+
+@task("record_payment")
+def record_payment(project_id, payer_id, payee_id, amount, status="completed"):
+    db.session.add(Payment(project_id=project_id, payer_id=payer_id,
+                           payee_id=payee_id, amount=amount, status=status))
+
+
+@task("send_email")
+def send_email(user_id, subject, body):
+    user = db.session.get(User, user_id)
+    if user is None or not user.email:
+        return
+    config = current_app.config
+    if not config.get("MAIL_SERVER"):
+        log.info("Email to %s: %s", user.email, subject)
+        return
+    mail = EmailMessage()
+    mail["From"] = config.get("MAIL_SENDER")
+    mail["To"] = user.email
+    mail["Subject"] = subject
+    mail.set_content(body)
+    with smtplib.SMTP(config["MAIL_SERVER"], config.get("MAIL_PORT", 25), timeout=30) as smtp:
+        smtp.send_message(mail)
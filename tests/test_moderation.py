@@ -0,0 +1,33 @@
+from models import db, User, Job, Project
+import moderation
+
+
+def _project(status, approval_code="1234", verified=False):
+    client = User(username=f"c-{status}", password="x", role="Client", status="approved")
+    student = User(username=f"s-{status}", password="x", role="Student", status="approved")
+    db.session.add_all([client, student])
+    db.session.flush()
+    job = Job(client_id=client.id, title="Job", description="Work", budget=10, status="closed")
+    db.session.add(job)
+    db.session.flush()
+    project = Project(job_id=job.id, student_id=student.id, client_id=client.id, status=status,
+                      approval_code=approval_code, verified=verified)
+    db.session.add(project)
+    db.session.commit()
+    return project.id
+
+
+def test_verify_projects_only_touches_submitted_projects(app):
+    submitted = _project("submitted")
+    in_progress = _project("in_progress")
+    no_code = _project("submitted", approval_code=None)
+
+    count = moderation.verify_projects([submitted, in_progress, no_code])
+    db.session.commit()
+
+    assert count == 1
+    assert db.session.get(Project, submitted).status == "completed"
+    assert db.session.get(Project, submitted).verified
+    assert db.session.get(Project, in_progress).status == "in_progress"
+    assert not db.session.get(Project, in_progress).verified
+    assert not db.session.get(Project, no_code).verified
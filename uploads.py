@@ -0,0 +1,157 @@
+"""Upload storage: bounded, chunked, content-addressed.
+
+Werkzeug spools each uploaded file while it parses the form, before the
+view runs (in memory up to 500 KB, then a temporary file). With
+:func:`init_app` the spool refuses to grow past ``UPLOAD_MAX_BYTES``, so an
+oversized file is rejected with 413 while it is still arriving. The view
+then copies the spooled file in chunks to a temporary file under the
+upload folder while its SHA-256 is computed, and moves it to
+``<folder>/<sha256><ext>``.
+Re-uploading identical content reuses the stored file, and distinct
+files can no longer overwrite each other. Post-processing (see
+:func:`register_processor`) is queued on the session and handed to a
+background thread pool once the request's transaction commits, so the
+request only pays for the copy and processors see the committed rows.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from flask import Request, current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.formparser import default_stream_factory
+from werkzeug.utils import secure_filename
+from models import db
+
+CHUNK_SIZE = 64 * 1024
+STATIC_ROOT = "static"
+
+log = logging.getLogger(__name__)
+
+_executor = None
+_processors = {}
+
+
+class UploadTooLarge(RequestEntityTooLarge):
+    description = "The uploaded file is too large."
+
+
+class _LimitedSpool:
+    """A form parser file stream that raises :class:`UploadTooLarge` past ``max_bytes``."""
+
+    def __init__(self, stream, max_bytes):
+        self._stream = stream
+        self._max_bytes = max_bytes
+        self._size = 0
+
+    def write(self, data):
+        self._size += len(data)
+        if self._size > self._max_bytes:
+            self._stream.close()
+            raise UploadTooLarge()
+        return self._stream.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+class UploadRequest(Request):
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        stream = default_stream_factory(total_content_length, content_type, filename, content_length)
+        return _LimitedSpool(stream, current_app.config.get("UPLOAD_MAX_BYTES", 16 * 1024 * 1024))
+
+
+def init_app(app):
+    """Enforce ``UPLOAD_MAX_BYTES`` while the request body is parsed."""
+    app.request_class = UploadRequest
+
+
+def register_processor(kind, func):
+    """Run ``func(app, static_path)`` in the background after a ``kind`` upload."""
+    _processors.setdefault(kind, []).append(func)
+
+
+def _get_executor(app):
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=app.config.get("UPLOAD_WORKERS", 2), thread_name_prefix="upload"
+        )
+    return _executor
+
+
+def _run_processor(app, func, path):
+    with app.app_context():
+        try:
+            func(app, path)
+        except Exception:
+            log.exception("Upload post-processing failed for %s", path)
+        finally:
+            db.session.remove()
+
+
+def store_upload(file, folder, kind=None):
+    """Store a werkzeug ``FileStorage`` under ``static/<folder>``.
+
+    Returns the path relative to ``static/`` (what the templates pass to
+    ``url_for('static', ...)``), or None when no file was sent. Raises
+    :class:`UploadTooLarge` past ``UPLOAD_MAX_BYTES``; with :func:`init_app`
+    the form parser has already rejected such files, so this is a backstop.
+
+    Any open read transaction is ended first so the database connection
+    is not held while the body is copied; call this before modifying
+    ORM objects in the request.
+    """
+    if not file or not file.filename:
+        return None
+    db.session.rollback()
+
+    max_bytes = current_app.config.get("UPLOAD_MAX_BYTES", 16 * 1024 * 1024)
+    directory = os.path.join(STATIC_ROOT, folder)
+    os.makedirs(directory, exist_ok=True)
+    _, ext = os.path.splitext(secure_filename(file.filename))
+
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".upload-")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = file.stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge()
+                digest.update(chunk)
+                out.write(chunk)
+
+        name = digest.hexdigest() + ext.lower()
+        final_path = os.path.join(directory, name)
+        if os.path.exists(final_path):
+            os.remove(tmp_path)  # identical content already stored
+        else:
+            os.replace(tmp_path, final_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    relative = f"{folder}/{name}"
+    if kind and kind in _processors:
+        jobs = db.session.info.setdefault("upload_jobs", [])
+        jobs.extend((func, relative) for func in _processors[kind])
+    return relative
+
+
+@event.listens_for(Session, "after_commit")
+def _submit_upload_jobs(session):
+    jobs = session.info.pop("upload_jobs", None)
+    if not jobs:
+        return
+    app = current_app._get_current_object()
+    for func, path in jobs:
+        _get_executor(app).submit(_run_processor, app, func, path)
@@ -0,0 +1,20 @@
+"""Production entry point.
+
+gunicorn (settings in gunicorn.conf.py)::
+
+    APP_CONFIG=config.ProductionConfig SECRET_KEY=... gunicorn wsgi:app
+
+uvicorn, serving the WSGI app from its own workers::
+
+    APP_CONFIG=config.ProductionConfig SECRET_KEY=... uvicorn wsgi:app --interface wsgi --workers 4
+
+Queued tasks run in a separate process: ``flask --app app run-worker``.
+"""
+from werkzeug.middleware.proxy_fix import ProxyFix
+from app import app
+
+if not app.config.get("SECRET_KEY"):
+    raise RuntimeError("SECRET_KEY must be set when serving the app in production")
+
+# Trust one reverse proxy for scheme and client address (https redirects, secure cookies)
+app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1, x_host=1)